@@ -3,63 +3,26 @@
 namespace App\Http\Controllers;
 
 use App\Models\UserProfile;
+use App\Services\Feed;
+use App\Services\ProfileStatsSync;
+use App\Services\WalletStats;
 use Illuminate\Http\Request;
 use Illuminate\Support\Facades\Auth;
 use Illuminate\Support\Facades\DB;
-use Illuminate\Support\Facades\Http;
 use Inertia\Inertia;
 use Inertia\Response;
 use Carbon\Carbon;
 
 class ProfileController extends Controller
 {
-    private function base(): string
-    {
-        // same base you use elsewhere
-        return rtrim(env('SOL_SERVICE_BASE', 'http://host.docker.internal:8001'), '/');
-    }
-
     /**
-     * Fetch on-chain stats (username, posts_created, etc.) for this wallet.
+     * On-chain stats (username, posts_created, etc.) for this wallet,
+     * from the Redis snapshot kept by WalletStats.
      * Falls back to sane defaults if user not on-chain yet or request fails.
-     * Also includes balance_sol now.
      */
-    private function fetchOnchainStatsOrDefaults(string $wallet): array
+    private function onchainStats(string $wallet): array
     {
-        if (!$wallet) {
-            return [
-                'username'        => null,
-                'posts_created'   => 0,
-                'likes_received'  => 0,
-                'likes_given'     => 0,
-                'balance_sol'     => 0,
-                'exists'          => false,
-            ];
-        }
-
-        $resp = Http::get($this->base() . '/read-user/' . $wallet);
-
-        if (!$resp->ok() || !$resp->json('ok')) {
-            return [
-                'username'        => null,
-                'posts_created'   => 0,
-                'likes_received'  => 0,
-                'likes_given'     => 0,
-                'balance_sol'     => 0,
-                'exists'          => false,
-            ];
-        }
-
-        $u = $resp->json('user');
-
-        return [
-            'username'        => $u['username']        ?? null,
-            'posts_created'   => $u['posts_created']   ?? 0,
-            'likes_received'  => $u['likes_received']  ?? 0,
-            'likes_given'     => $u['likes_given']     ?? 0,
-            'balance_sol'     => $u['balance_sol']     ?? 0,
-            'exists'          => true,
-        ];
+        return app(WalletStats::class)->get($wallet);
     }
 
     /**
@@ -93,46 +56,46 @@ private function humanTime(Carbon $ts): string
     }
 
     /**
-     * Load this user's posts (joined chunks -> full text) newest first
-     * and shape them like PostCard expects.
+     * Load this user's posts newest first and shape them like PostCard
+     * expects. One query; text from posts.content_full, chunks only for
+     * legacy rows that don't have it.
      */
     private function loadUserPostsForUi(int $userId): array
     {
         $rows = DB::table('posts')
-            ->where('author_id', $userId)
-            ->orderByDesc('created_at')
+            ->join('users', 'posts.author_id', '=', 'users.id')
+            ->where('posts.author_id', $userId)
+            ->orderByDesc('posts.created_at')
             ->limit(50)
-            ->get();
+            ->get([
+                'posts.id',
+                'posts.content_full',
+                'posts.created_at',
+                'posts.likes_count',
+                'posts.comments_count',
+                'posts.root_signature',
+                'users.name as author_name',
+                'users.wallet as author_wallet',
+            ]);
+
+        $texts = app(Feed::class)->legacyTexts(
+            $rows->whereNull('content_full')->pluck('id')->all()
+        );
 
         $result = [];
 
         foreach ($rows as $postRow) {
-            $chunks = DB::table('post_chunks')
-                ->where('post_id', $postRow->id)
-                ->orderBy('chunk_index')
-                ->get();
-
-            $fullText = '';
-            foreach ($chunks as $c) {
-                $fullText .= $c->content;
-            }
-
-            $authorData = DB::table('users')
-                ->select('name', 'wallet')
-                ->where('id', $postRow->author_id)
-                ->first();
-
             $createdAt = $postRow->created_at ? Carbon::parse($postRow->created_at) : now();
 
             $result[] = [
                 'id'           => $postRow->id,
                 'author'       => [
-                    'name'       => $authorData->name ?? 'Unknown',
-                    'handle'     => $authorData->wallet ? substr($authorData->wallet, 0, 6) : null,
-                    'wallet'     => $authorData->wallet ?? null,
+                    'name'       => $postRow->author_name ?? 'Unknown',
+                    'handle'     => $postRow->author_wallet ? substr($postRow->author_wallet, 0, 6) : null,
+                    'wallet'     => $postRow->author_wallet ?? null,
                     'avatar_url' => null,
                 ],
-                'text'         => $fullText,
+                'text'         => $postRow->content_full ?? ($texts[$postRow->id] ?? ''),
                 'createdAt'    => $this->humanTime($createdAt),
                 'liked'        => false,
                 'likeCount'    => $postRow->likes_count ?? 0,
@@ -165,8 +128,9 @@ public function show(Request $req): Response
         // local profile row (nickname/bio) if any
         $profile = UserProfile::where('user_id', $me->id)->first();
 
-        // on-chain stats + existence + balance
-        $onchain = $this->fetchOnchainStatsOrDefaults($me->wallet ?? '');
+        // on-chain stats + existence + balance: the columns profiles:sync
+        // keeps, or the Redis snapshot until the job has reached this user
+        $onchain = ProfileStatsSync::local($me) ?? $this->onchainStats($me->wallet ?? '');
 
         // user's posts
         $posts = $this->loadUserPostsForUi($me->id);
@@ -246,8 +210,12 @@ public function saveLocalProfile(Request $req)
             ], 401);
         }
 
-        // must already exist on-chain to proceed
-        $onchain = $this->fetchOnchainStatsOrDefaults($me->wallet ?? '');
+        // must already exist on-chain to proceed.
+        // a snapshot can predate init-user, so re-check before refusing
+        $onchain = $this->onchainStats($me->wallet ?? '');
+        if (!$onchain['exists'] && $me->wallet) {
+            $onchain = app(WalletStats::class)->fetch($me->wallet);
+        }
         if (!$onchain['exists']) {
             return response()->json([
                 'ok'    => false,
@@ -2,19 +2,119 @@
 
 namespace App\Http\Controllers;
 
+use App\Services\PostStore;
+use App\Services\ProfileStatsSync;
+use App\Services\SolCommandBus;
+use App\Services\Tracer;
+use GuzzleHttp\Exception\ConnectException;
+use Illuminate\Http\Client\ConnectionException;
 use Illuminate\Http\Request;
 use Illuminate\Support\Facades\Auth;
-use Illuminate\Support\Facades\Http;
 use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Http;
 use Illuminate\Support\Facades\Storage;
+use Illuminate\Support\Str;
 use Carbon\Carbon;
 
 class SolanaController extends Controller
 {
     private function base(): string
     {
-        // configure in .env : SOL_SERVICE_BASE=http://host.docker.internal:8001
-        return rtrim(env('SOL_SERVICE_BASE', 'http://host.docker.internal:8001'), '/');
+        // services.sol.base (SOL_SERVICE_BASE=http://host.docker.internal:8001)
+        return rtrim(config('services.sol.base'), '/');
+    }
+
+    /**
+     * Send a command to the python service.
+     *
+     * stream transport: XADD it and answer right away with
+     *   { ok, queued, command_id } (202); the client polls /sol/command/{id}.
+     * http transport (or Redis down): plain POST like before.
+     *
+     * @return array{0: array, 1: int} [json body, http status]
+     */
+    private function dispatchSol(string $command, array $payload): array
+    {
+        [$body, $status] = $this->sendSol($command, $payload);
+
+        // the synced profile columns of everyone this touched are stale now
+        if ($status < 300) {
+            ProfileStatsSync::forget(...array_map(
+                'strval',
+                array_values(array_intersect_key($payload, array_flip(['owner', 'liker', 'post_owner']))),
+            ));
+        }
+
+        return [$body, $status];
+    }
+
+    private function sendSol(string $command, array $payload): array
+    {
+        $bus = app(SolCommandBus::class);
+
+        if ($bus->enabled() && ($id = $bus->enqueue($command, $payload)) !== null) {
+            return [[
+                'ok'         => true,
+                'queued'     => true,
+                'command_id' => $id,
+            ], 202];
+        }
+
+        // retried only when the request never reached python: a timeout
+        // may have sent the tx already, and the Idempotency-Key only
+        // dedupes when python runs with Redis
+        try {
+            $resp = Http::asJson()
+                ->withHeaders(['Idempotency-Key' => (string) Str::uuid()])
+                ->timeout(config('services.sol.timeout', 30))
+                ->retry(3, 200, fn ($e) => self::notSent($e), throw: false)
+                ->post($this->base().'/'.$command, $payload);
+        } catch (ConnectionException $e) {
+            return [['detail' => self::notSent($e) ? 'sol_service_unreachable' : 'sol_service_timeout'], 504];
+        }
+
+        return [$resp->json() ?? ['detail' => $resp->body()], $resp->status()];
+    }
+
+    /**
+     * cURL couldn't resolve / connect (errno 6 / 7): nothing was sent.
+     */
+    private static function notSent(\Throwable $e): bool
+    {
+        if (!$e instanceof ConnectionException) {
+            return false;
+        }
+
+        $prev = $e->getPrevious();
+        if ($prev instanceof ConnectException && isset($prev->getHandlerContext()['errno'])) {
+            return in_array($prev->getHandlerContext()['errno'], [6, 7], true);
+        }
+
+        return preg_match('/cURL error (6|7):/', $e->getMessage()) === 1;
+    }
+
+    /**
+     * GET /sol/command/{id}
+     * Result of a queued command, or { pending: true } until it's done.
+     * A queued post is stored the first time its result is seen.
+     */
+    public function command(string $id, PostStore $posts)
+    {
+        $result = app(SolCommandBus::class)->result($id);
+        if ($result === null) {
+            return response()->json([
+                'ok'      => true,
+                'pending' => true,
+            ], 202);
+        }
+
+        [$body, $status] = $result;
+
+        if (($postId = $posts->settle($id, $body, $status)) !== null) {
+            $body['post_id'] = $postId;
+        }
+
+        return response()->json($body, $status);
     }
 
     /**
@@ -59,12 +159,27 @@ private function publicMediaUrl(string $relativePath): string
         return Storage::disk('public')->url($relativePath);
     }
 
+    private function mediaBase(): ?string
+    {
+        // services.media.base (MEDIA_SERVICE_BASE=http://host.docker.internal:8002)
+        // empty -> store originals locally like before
+        $base = config('services.media.base');
+        return $base ? rtrim($base, '/') : null;
+    }
+
     /**
      * POST /sol/upload-image
      *
-     * Accept ONE image file (jpeg/png/webp/gif/etc),
-     * save to storage/app/public/post_media/{randomname.ext},
-     * return { ok:true, url:"/storage/post_media/..." }
+     * Accept ONE image file (jpeg/png/webp/gif/etc).
+     *
+     * With the media service (sol-client/media_service.py): it dedupes by
+     * content hash and writes resized webp/avif variants into
+     * storage/app/public/post_media/v/{sha256}/, we return
+     *   { ok:true, url, srcset, variants:[{url,width,format}] }
+     *
+     * Without it (or when it fails): the original is saved as
+     * storage/app/public/post_media/{sha256}.{ext}, same bytes -> same file,
+     *   { ok:true, url:"/storage/post_media/..." }
      */
     public function uploadImage(Request $req)
     {
@@ -87,7 +202,17 @@ public function uploadImage(Request $req)
 
         $file = $req->file('image');
 
-        $storedPath = $file->store('post_media', 'public');
+        if ($media = $this->uploadToMediaService($file)) {
+            return response()->json($media);
+        }
+
+        $disk = Storage::disk('public');
+        $ext  = $file->extension() ?: 'bin';
+        $storedPath = 'post_media/' . hash_file('sha256', $file->getRealPath()) . '.' . $ext;
+
+        if (!$disk->exists($storedPath)) {
+            $storedPath = $file->storeAs('post_media', basename($storedPath), 'public');
+        }
 
         if (!$storedPath) {
             return response()->json([
@@ -104,6 +229,50 @@ public function uploadImage(Request $req)
         ]);
     }
 
+    /**
+     * Hand the upload to the media service, null if it's not configured
+     * or didn't answer (caller falls back to local storage).
+     */
+    private function uploadToMediaService($file): ?array
+    {
+        $base = $this->mediaBase();
+        if (!$base) {
+            return null;
+        }
+
+        try {
+            $resp = Http::timeout(30)
+                ->attach('file', file_get_contents($file->getRealPath()), $file->getClientOriginalName())
+                ->post($base . '/media');
+        } catch (\Throwable $e) {
+            logger()->warning('media service unreachable: ' . $e->getMessage());
+            return null;
+        }
+
+        if (!$resp->ok() || !$resp->json('ok')) {
+            logger()->warning('media service failed', ['status' => $resp->status(), 'body' => $resp->body()]);
+            return null;
+        }
+
+        $variants = [];
+        $srcset = [];
+        foreach ($resp->json('variants') ?? [] as $v) {
+            $url = $this->publicMediaUrl($v['path']);
+            $variants[] = ['url' => $url, 'width' => $v['width'], 'format' => $v['format']];
+            if ($v['format'] === 'webp') {
+                $srcset[] = $url . ' ' . $v['width'] . 'w';
+            }
+        }
+
+        return [
+            'ok'       => true,
+            'url'      => $this->publicMediaUrl($resp->json('src_path')),
+            'srcset'   => implode(', ', $srcset),
+            'variants' => $variants,
+            'deduped'  => (bool) $resp->json('deduped'),
+        ];
+    }
+
     public function initUser(Request $req)
     {
         $data = $req->validate([
@@ -118,12 +287,12 @@ public function initUser(Request $req)
             ], 401);
         }
 
-        $resp = Http::asJson()->post($this->base().'/init-user', [
+        [$body, $status] = $this->dispatchSol('init-user', [
             'owner'    => $owner,
             'username' => $data['username'],
         ]);
 
-        return response()->json($resp->json(), $resp->status());
+        return response()->json($body, $status);
     }
 
     /**
@@ -132,11 +301,11 @@ public function initUser(Request $req)
      * Expects final "text" which ALREADY includes any uploaded image URLs
      * (and GIF URL etc).
      */
-    public function post(Request $req)
+    public function post(Request $req, Tracer $tracer, PostStore $posts)
     {
-        $data = $req->validate([
+        $data = $tracer->span('validate', fn () => $req->validate([
             'text' => ['required','string','max:5000'],
-        ]);
+        ]));
 
         $laravelUser = Auth::user();
         $owner = $laravelUser?->wallet;
@@ -155,62 +324,36 @@ public function post(Request $req)
         ]);
 
         // 1. Call python -> actually send on-chain tx(s)
-        $resp = Http::asJson()->post($this->base().'/post', [
+        [$body, $status] = $this->dispatchSol('post', [
             'owner' => $owner,
             'text'  => $data['text'],
         ]);
 
-        if (!$resp->ok() || !($resp->json('ok'))) {
+        if ($status === 202 && ($body['queued'] ?? false)) {
+            // queued: the rows are written by whoever sees the result
+            // first (/sol/command/{id}, which the UI polls, or posts:collect)
+            $posts->pending($body['command_id'], $laravelUser->id, $data['text']);
+            return response()->json($body, 202);
+        }
+
+        if ($status !== 200 || !($body['ok'] ?? false)) {
             return response()->json([
                 'ok'    => false,
-                'error' => $resp->json('detail') ?? $resp->body(),
-            ], $resp->status() ?: 500);
+                'error' => $body['detail'] ?? $body['error'] ?? 'sol_service_error',
+            ], $status >= 400 ? $status : 500);
         }
 
         // python response
-        $rootSig    = $resp->json('root_sig');
-        $chunksResp = $resp->json('chunks'); // [{ index,total,tx_signature,content_utf8 }, ...]
+        $rootSig    = $body['root_sig'];
+        $chunksResp = $body['chunks']; // [{ index,total,tx_signature,content_utf8 }, ...]
         $now        = now();
 
         // 2. Store in DB immediately
-        $postId = null;
-
-        DB::transaction(function () use (
-            $laravelUser,
-            $rootSig,
-            $data,
-            $now,
-            $chunksResp,
-            &$postId
-        ) {
-            // posts row
-            $postId = DB::table('posts')->insertGetId([
-                'author_id'               => $laravelUser->id,
-                'root_signature'          => $rootSig,
-                'first_slot'              => 0,
-                'first_block_time'        => $now,
-                'content_short'           => mb_substr($data['text'], 0, 200),
-                'reply_to_root_signature' => null,
-                'likes_count'             => 0,
-                'comments_count'          => 0,
-                'created_at'              => $now,
-                'updated_at'              => $now,
-            ]);
-
-            // child chunks
-            foreach ($chunksResp as $chunk) {
-                DB::table('post_chunks')->insert([
-                    'post_id'      => $postId,
-                    'chunk_index'  => $chunk['index'],
-                    'tx_signature' => $chunk['tx_signature'],
-                    'slot'         => 0,
-                    'block_time'   => $now,
-                    'content'      => $chunk['content_utf8'],
-                    'created_at'   => $now,
-                    'updated_at'   => $now,
-                ]);
-            }
-        });
+        $postId = $tracer->span(
+            'db.transaction posts',
+            fn () => $posts->store($laravelUser->id, $data['text'], $body),
+            ['post.chunks' => count($chunksResp)],
+        );
 
         // 3. Build full text from chunks
         usort($chunksResp, fn($a,$b) => $a['index'] <=> $b['index']);
@@ -256,13 +399,13 @@ public function like(Request $req)
             ], 401);
         }
 
-        $resp = Http::asJson()->post($this->base().'/like', [
+        [$body, $status] = $this->dispatchSol('like', [
             'post_owner' => $data['post_owner'],
             'post_seq'   => $data['post_seq'],
             'liker'      => $liker,
         ]);
 
-        return response()->json($resp->json(), $resp->status());
+        return response()->json($body, $status);
     }
 
     // debug-ish, but also used by ProfileController to sync on-chain stats
@@ -272,9 +415,21 @@ public function readUser(string $owner)
         return response()->json($resp->json(), $resp->status());
     }
 
+    /**
+     * GET /sol/post/{sig}, any chunk sig of the post.
+     * Python needs every chunk tx to rebuild it, we know them.
+     */
     public function readPost(string $sig)
     {
-        $resp = Http::get($this->base().'/read-post/'.$sig);
+        $postId = DB::table('post_chunks')->where('tx_signature', $sig)->value('post_id')
+            ?? DB::table('posts')->where('root_signature', $sig)->value('id');
+
+        $also = $postId
+            ? DB::table('post_chunks')->where('post_id', $postId)->where('tx_signature', '!=', $sig)
+                ->orderBy('chunk_index')->pluck('tx_signature')->all()
+            : [];
+
+        $resp = Http::get($this->base().'/read-post/'.$sig, array_filter(['also' => implode(',', $also)]));
         return response()->json($resp->json(), $resp->status());
     }
 
@@ -299,19 +454,19 @@ public function deposit(Request $req)
             'amount_sol' => ['required','numeric','gt:0'],
         ]);
 
-        $resp = Http::asJson()->post($this->base().'/deposit', [
+        [$body, $status] = $this->dispatchSol('deposit', [
             'owner'      => $me->wallet,
             'amount_sol' => (float)$data['amount_sol'],
         ]);
 
-        if (!$resp->ok()) {
+        if ($status >= 300) {
             return response()->json([
                 'ok'    => false,
-                'error' => $resp->json('detail') ?? $resp->body(),
-            ], $resp->status() ?: 500);
+                'error' => $body['detail'] ?? 'sol_service_error',
+            ], $status ?: 500);
         }
 
-        return response()->json($resp->json(), $resp->status());
+        return response()->json($body, $status);
     }
 
     /**
@@ -335,18 +490,18 @@ public function withdraw(Request $req)
             'amount_sol' => ['required','numeric','gt:0'],
         ]);
 
-        $resp = Http::asJson()->post($this->base().'/withdraw', [
+        [$body, $status] = $this->dispatchSol('withdraw', [
             'owner'      => $me->wallet,
             'amount_sol' => (float)$data['amount_sol'],
         ]);
 
-        if (!$resp->ok()) {
+        if ($status >= 300) {
             return response()->json([
                 'ok'    => false,
-                'error' => $resp->json('detail') ?? $resp->body(),
-            ], $resp->status() ?: 500);
+                'error' => $body['detail'] ?? 'sol_service_error',
+            ], $status ?: 500);
         }
 
-        return response()->json($resp->json(), $resp->status());
+        return response()->json($body, $status);
     }
 }
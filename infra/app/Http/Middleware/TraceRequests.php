@@ -0,0 +1,35 @@
+<?php
+
+namespace App\Http\Middleware;
+
+use App\Services\Tracer;
+use Closure;
+use Illuminate\Http\Request;
+use Symfony\Component\HttpFoundation\Response;
+
+/**
+ * Root span per request (continues an incoming traceparent).
+ * See App\Services\Tracer.
+ */
+class TraceRequests
+{
+    public function __construct(private Tracer $tracer)
+    {
+    }
+
+    public function handle(Request $request, Closure $next): Response
+    {
+        $this->tracer->start($request);
+
+        try {
+            $response = $next($request);
+        } catch (\Throwable $e) {
+            $this->tracer->finish(500);
+            throw $e;
+        }
+
+        $this->tracer->finish($response->getStatusCode());
+
+        return $response;
+    }
+}
@@ -9,8 +9,8 @@
 class Post extends Model
 {
     protected $fillable = [
-        'author_id','root_signature','first_slot','first_block_time',
-        'content_short','reply_to_root_signature','likes_count','comments_count'
+        'author_id','seq','root_signature','first_slot','first_block_time',
+        'content_short','content_full','reply_to_root_signature','likes_count','comments_count'
     ];
 
     protected $casts = [
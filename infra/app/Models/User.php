@@ -28,6 +28,8 @@ class User extends Authenticatable
         'onchain_posts_created',
         'onchain_likes_received',
         'onchain_likes_given',
+        'onchain_balance_lamports',
+        'onchain_synced_at',
     ];
 
     /**
@@ -48,14 +50,16 @@ class User extends Authenticatable
     protected function casts(): array
     {
         return [
-            'email_verified_at'      => 'datetime',
-            'password'               => 'hashed',
+            'email_verified_at'        => 'datetime',
+            'password'                 => 'hashed',
 
             // these come back as numbers from python,
             // and we want to treat them as ints in PHP/JSON:
-            'onchain_posts_created'  => 'integer',
-            'onchain_likes_received' => 'integer',
-            'onchain_likes_given'    => 'integer',
+            'onchain_posts_created'    => 'integer',
+            'onchain_likes_received'   => 'integer',
+            'onchain_likes_given'      => 'integer',
+            'onchain_balance_lamports' => 'integer',
+            'onchain_synced_at'        => 'datetime',
         ];
     }
 }
@@ -2,7 +2,12 @@
 
 namespace App\Providers;
 
+use App\Services\Tracer;
+use Illuminate\Database\Events\QueryExecuted;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Http;
 use Illuminate\Support\ServiceProvider;
+use Psr\Http\Message\RequestInterface;
 
 class AppServiceProvider extends ServiceProvider
 {
@@ -11,7 +16,8 @@ class AppServiceProvider extends ServiceProvider
      */
     public function register(): void
     {
-        //
+        // one trace per request
+        $this->app->scoped(Tracer::class);
     }
 
     /**
@@ -19,6 +25,52 @@ public function register(): void
      */
     public function boot(): void
     {
-        //
+        $this->traceOutgoingHttp();
+
+        DB::listen(function (QueryExecuted $query) {
+            $verb = strtolower(strtok(ltrim($query->sql), " \n\t(") ?: 'query');
+            app(Tracer::class)->record('db ' . $verb, $query->time, ['db.system' => $query->connection->getDriverName()]);
+        });
+    }
+
+    /**
+     * A span per outgoing Http call; calls to our own services
+     * (sol / media) also carry traceparent.
+     */
+    private function traceOutgoingHttp(): void
+    {
+        $ownHosts = array_filter(array_map(
+            fn ($base) => $base ? parse_url($base, PHP_URL_HOST) : null,
+            [config('services.sol.base'), config('services.media.base')],
+        ));
+
+        Http::globalMiddleware(function (callable $handler) use ($ownHosts) {
+            return function (RequestInterface $request, array $options) use ($handler, $ownHosts) {
+                $tracer = app(Tracer::class);
+                if (!$tracer->active()) {
+                    return $handler($request, $options);
+                }
+
+                $span = $tracer->begin('http ' . $request->getMethod() . ' ' . $request->getUri()->getPath(), [
+                    'http.method' => $request->getMethod(),
+                    'http.host'   => $request->getUri()->getHost(),
+                ]);
+
+                if (in_array($request->getUri()->getHost(), $ownHosts, true)) {
+                    $request = $request->withHeader('traceparent', $tracer->traceparent());
+                }
+
+                return $handler($request, $options)->then(
+                    function ($response) use ($tracer, $span) {
+                        $tracer->end($span, ['http.status_code' => $response->getStatusCode()]);
+                        return $response;
+                    },
+                    function ($reason) use ($tracer, $span) {
+                        $tracer->end($span, [], $reason instanceof \Throwable ? $reason->getMessage() : 'failed');
+                        return \GuzzleHttp\Promise\Create::rejectionFor($reason);
+                    },
+                );
+            };
+        });
     }
 }
@@ -0,0 +1,171 @@
+<?php
+
+namespace App\Services;
+
+use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Facades\DB;
+
+/**
+ * Feed pages, newest first, keyset-paginated on (created_at, id).
+ *
+ * Text comes from posts.content_full (materialized on write), so a page
+ * is one indexed query no matter how big posts / post_chunks get.
+ * The first HOT_PAGES pages are cached; any new post bumps the feed
+ * version, which retires every cached page at once.
+ */
+class Feed
+{
+    public const PAGE_SIZE = 50;
+
+    // pages 1..HOT_PAGES are served from cache
+    private const HOT_PAGES = 3;
+    private const CACHE_TTL = 300;
+    private const VERSION_KEY = 'feed:version';
+
+    /**
+     * @return array{rows: array<int, array>, next_cursor: ?string}
+     */
+    public function page(?string $cursor = null, int $limit = self::PAGE_SIZE): array
+    {
+        $after = $cursor ? self::decodeCursor($cursor) : null;
+        if (!$after) {
+            $cursor = null; // garbage cursor -> first page
+        }
+        $depth = $after['p'] ?? 0; // how many pages came before this one
+
+        if ($depth >= self::HOT_PAGES) {
+            return $this->load($after, $limit, $depth);
+        }
+
+        $key = sprintf('feed:v%d:%s:%d', $this->version(), $cursor ?? 'head', $limit);
+
+        return $this->store()->remember(
+            $key,
+            self::CACHE_TTL,
+            fn () => $this->load($after, $limit, $depth),
+        );
+    }
+
+    /**
+     * Call after a post is written (or indexed).
+     */
+    public static function invalidate(): void
+    {
+        $store = (new self)->store();
+        $store->add(self::VERSION_KEY, 0);
+        $store->increment(self::VERSION_KEY);
+    }
+
+    private function load(?array $after, int $limit, int $depth): array
+    {
+        $q = DB::table('posts')
+            ->join('users', 'posts.author_id', '=', 'users.id')
+            ->orderByDesc('posts.created_at')
+            ->orderByDesc('posts.id')
+            ->limit($limit + 1);
+
+        if ($after) {
+            $q->where(function ($w) use ($after) {
+                $w->where('posts.created_at', '<', $after['t'])
+                    ->orWhere(function ($w2) use ($after) {
+                        $w2->where('posts.created_at', '=', $after['t'])
+                            ->where('posts.id', '<', $after['id']);
+                    });
+            });
+        }
+
+        $rows = $q->get([
+            'posts.id as id',
+            'users.name as author_name',
+            'users.wallet as author_wallet',
+            'posts.root_signature as tx',
+            'posts.created_at as created_at',
+            'posts.content_full as content_full',
+            'posts.likes_count as likes_count',
+            'posts.comments_count as comments_count',
+        ]);
+
+        $hasMore = $rows->count() > $limit;
+        $rows = $rows->take($limit)->values();
+
+        $texts = $this->legacyTexts(
+            $rows->whereNull('content_full')->pluck('id')->all()
+        );
+
+        $out = $rows->map(fn ($r) => [
+            'id'             => $r->id,
+            'author_name'    => $r->author_name,
+            'author_wallet'  => $r->author_wallet,
+            'tx'             => $r->tx,
+            'created_at'     => (string) $r->created_at,
+            'text'           => $r->content_full ?? ($texts[$r->id] ?? ''),
+            'likes_count'    => (int) ($r->likes_count ?? 0),
+            'comments_count' => (int) ($r->comments_count ?? 0),
+        ])->all();
+
+        $last = end($out);
+
+        return [
+            'rows'        => $out,
+            'next_cursor' => $hasMore && $last
+                ? self::encodeCursor($last['created_at'], $last['id'], $depth + 1)
+                : null,
+        ];
+    }
+
+    /**
+     * Stitch chunks for rows written before content_full existed
+     * and not backfilled yet.
+     */
+    public function legacyTexts(array $postIds): array
+    {
+        if (!$postIds) {
+            return [];
+        }
+
+        $texts = [];
+        $chunks = DB::table('post_chunks')
+            ->whereIn('post_id', $postIds)
+            ->orderBy('chunk_index')
+            ->get(['post_id', 'content']);
+
+        foreach ($chunks as $c) {
+            $texts[$c->post_id] = ($texts[$c->post_id] ?? '') . $c->content;
+        }
+
+        return $texts;
+    }
+
+    private function version(): int
+    {
+        return (int) $this->store()->get(self::VERSION_KEY, 0);
+    }
+
+    private function store()
+    {
+        return Cache::store(config('services.feed.cache_store'));
+    }
+
+    private static function encodeCursor(string $createdAt, int $id, int $depth): string
+    {
+        $json = json_encode(['t' => $createdAt, 'id' => $id, 'p' => $depth]);
+
+        return rtrim(strtr(base64_encode($json), '+/', '-_'), '=');
+    }
+
+    private static function decodeCursor(string $cursor): ?array
+    {
+        $json = base64_decode(strtr($cursor, '-_', '+/'), true);
+        $c = $json ? json_decode($json, true) : null;
+
+        if (!is_array($c) || !isset($c['t'], $c['id'])) {
+            return null;
+        }
+
+        return [
+            't'  => (string) $c['t'],
+            'id' => (int) $c['id'],
+            'p'  => (int) ($c['p'] ?? 1),
+        ];
+    }
+}
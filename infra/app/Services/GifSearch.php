@@ -0,0 +1,258 @@
+<?php
+
+namespace App\Services;
+
+use Illuminate\Contracts\Cache\LockTimeoutException;
+use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Facades\Http;
+use Illuminate\Support\Facades\Log;
+
+use function Illuminate\Support\defer;
+
+/**
+ * Tenor search behind a cache, for the GIF picker.
+ *
+ * - queries are normalized ("  Cats!! " == "cats"), and we always fetch
+ *   MAX_LIMIT results so every ?limit shares one entry
+ * - entries live in the cache store (Redis in prod). A hit slides the
+ *   expiry, so keys nobody asks for drop out (LRU-ish); the hard bound
+ *   is Redis maxmemory with an LRU policy
+ * - one upstream call per query at a time (Cache::lock), the others
+ *   wait for it and read the cache
+ * - an entry older than FRESH_SECONDS is still served and refreshed
+ *   after the response; if Tenor is down we keep serving it
+ * - empty query = trending, warmed by `gif:prefetch` on a schedule
+ */
+class GifSearch
+{
+    public const MAX_LIMIT = 50;
+
+    // served without a refresh
+    private const FRESH_SECONDS = 600;
+    // entry dropped after this long without a hit
+    private const IDLE_TTL = 86400;
+    // re-put at most this often to slide the expiry
+    private const TOUCH_EVERY = 3600;
+    // after an upstream failure, misses fail fast for this long
+    private const DOWN_SECONDS = 30;
+    // how long a request waits for someone else's fetch of the same query
+    private const LOCK_WAIT = 5;
+
+    private const TRENDING = '';
+
+    public static function normalize(string $q): string
+    {
+        $q = mb_strtolower($q);
+        $q = preg_replace('/[^\p{L}\p{N}\s]+/u', ' ', $q) ?? '';
+        $q = preg_replace('/\s+/u', ' ', $q) ?? '';
+
+        return mb_substr(trim($q), 0, 64);
+    }
+
+    /**
+     * @return array{gifs: string[], stale: bool}|null  null = upstream failed, nothing cached
+     */
+    public function search(string $q, int $limit): ?array
+    {
+        $norm = self::normalize($q);
+        $limit = max(1, min($limit, self::MAX_LIMIT));
+
+        $now = now()->getTimestamp();
+        $entry = $this->read($norm);
+
+        if ($entry === null) {
+            $entry = $this->fetchOnce($norm);
+            if ($entry === null) {
+                return null;
+            }
+        }
+
+        $stale = $now - $entry['fetched_at'] > self::FRESH_SECONDS;
+
+        if ($stale) {
+            $this->refreshAfterResponse($norm);
+        } elseif ($now - ($entry['touched_at'] ?? 0) > self::TOUCH_EVERY) {
+            $this->write($norm, $entry);
+        }
+
+        return [
+            'gifs'  => array_slice($entry['gifs'], 0, $limit),
+            'stale' => $stale,
+        ];
+    }
+
+    /**
+     * Warm trending results + the current trending search terms.
+     * Returns how many entries were (re)fetched.
+     */
+    public function prefetchTrending(int $terms = 20): int
+    {
+        $warmed = $this->refresh(self::TRENDING) ? 1 : 0;
+
+        try {
+            $res = Http::timeout($this->timeout())->get($this->base() . '/trending_terms', [
+                'key'   => $this->key(),
+                'limit' => $terms,
+            ]);
+        } catch (\Throwable $e) {
+            Log::warning('tenor trending_terms failed', ['error' => $e->getMessage()]);
+            return $warmed;
+        }
+
+        foreach ($res->ok() ? ($res->json('results') ?? []) : [] as $term) {
+            if (is_string($term) && $this->refresh(self::normalize($term))) {
+                $warmed++;
+            }
+        }
+
+        return $warmed;
+    }
+
+    /**
+     * Miss path: one request per query talks to Tenor, the rest wait.
+     */
+    private function fetchOnce(string $norm): ?array
+    {
+        $down = fn () => $this->store()->has('gif:upstream_down');
+        if ($down()) {
+            return null;
+        }
+
+        try {
+            return $this->store()
+                ->lock($this->keyFor($norm) . ':lock', 15)
+                ->block(self::LOCK_WAIT, fn () => $this->read($norm) ?? ($down() ? null : $this->refresh($norm)));
+        } catch (LockTimeoutException $e) {
+            return $this->read($norm);
+        }
+    }
+
+    private function refreshAfterResponse(string $norm): void
+    {
+        if (!$this->store()->add($this->keyFor($norm) . ':refreshing', 1, 30)) {
+            return;
+        }
+
+        defer(fn () => $this->refresh($norm));
+    }
+
+    /**
+     * Fetch from Tenor and store. Null (cache untouched) on failure.
+     */
+    private function refresh(string $norm): ?array
+    {
+        $gifs = $this->upstream($norm);
+        if ($gifs === null) {
+            $this->store()->put('gif:upstream_down', 1, self::DOWN_SECONDS);
+            return null;
+        }
+
+        $entry = ['gifs' => $gifs, 'fetched_at' => now()->getTimestamp()];
+        $this->write($norm, $entry);
+
+        return $entry;
+    }
+
+    /**
+     * @return string[]|null
+     */
+    private function upstream(string $norm): ?array
+    {
+        // Keep params simple & compatible with v1
+        $params = [
+            'key'        => $this->key(),
+            'client_key' => config('app.name', 'app'),
+            'limit'      => self::MAX_LIMIT,
+            // Tip: removing 'media_filter' avoids shape changes across v1/v2
+            // 'media_filter' => 'minimal',
+        ];
+
+        if ($norm === self::TRENDING) {
+            $url = $this->base() . '/trending';
+        } else {
+            $url = $this->base() . '/search';
+            $params['q'] = $norm;
+        }
+
+        try {
+            $res = Http::timeout($this->timeout())->get($url, $params);
+        } catch (\Throwable $e) {
+            Log::warning('tenor request failed', ['q' => $norm, 'error' => $e->getMessage()]);
+            return null;
+        }
+
+        if ($res->failed()) {
+            Log::warning('tenor request failed', ['q' => $norm, 'status' => $res->status()]);
+            return null;
+        }
+
+        return self::gifUrls($res->json('results') ?? []);
+    }
+
+    /**
+     * @return string[]
+     */
+    private static function gifUrls(array $results): array
+    {
+        $out = [];
+
+        foreach ($results as $r) {
+            // v1 shape: results[].media is an ARRAY of objects
+            // e.g. media[0].tinygif.url / .gif.url / .mediumgif.url
+            // v2 fallback: 'media_formats' object
+            $m = $r['media'][0] ?? $r['media_formats'] ?? null;
+            if (!is_array($m)) {
+                continue;
+            }
+
+            $url =
+                ($m['tinygif']['url'] ?? null) ??
+                ($m['nanogif']['url'] ?? null) ??
+                ($m['mediumgif']['url'] ?? null) ??
+                ($m['gif']['url'] ?? null);
+            if ($url) {
+                $out[] = $url;
+            }
+        }
+
+        return $out;
+    }
+
+    private function read(string $norm): ?array
+    {
+        $entry = $this->store()->get($this->keyFor($norm));
+
+        return is_array($entry) && isset($entry['gifs'], $entry['fetched_at']) ? $entry : null;
+    }
+
+    private function write(string $norm, array $entry): void
+    {
+        $entry['touched_at'] = now()->getTimestamp();
+        $this->store()->put($this->keyFor($norm), $entry, self::IDLE_TTL);
+    }
+
+    private function keyFor(string $norm): string
+    {
+        return 'gif:q:' . md5($norm);
+    }
+
+    private function base(): string
+    {
+        return rtrim(config('services.tenor.base'), '/');
+    }
+
+    private function key(): string
+    {
+        return (string) config('services.tenor.key');
+    }
+
+    private function timeout(): int
+    {
+        return (int) config('services.tenor.timeout', 4);
+    }
+
+    private function store()
+    {
+        return Cache::store(config('services.tenor.cache_store'));
+    }
+}
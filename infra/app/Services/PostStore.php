@@ -0,0 +1,142 @@
+<?php
+
+namespace App\Services;
+
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Log;
+use Illuminate\Support\Facades\Redis;
+
+/**
+ * Writes the posts / post_chunks rows for a post python has sent.
+ *
+ * Idempotent on root_signature (and chunk tx_signature), both unique,
+ * so the same python result can be stored by whoever sees it first:
+ *
+ * - POST /sol/post, on the http transport
+ * - GET /sol/command/{id}, when the client polls for it
+ * - posts:collect, for commands nobody polled
+ *
+ * Posts still waiting for their stream result live in the hash
+ * sol:pending_posts (command id => {author_id, text, at}).
+ */
+class PostStore
+{
+    private const PENDING_KEY = 'sol:pending_posts';
+
+    // results live for result_ttl in sol-client/command_bus.py
+    private const PENDING_MAX_AGE = 3600;
+
+    /**
+     * Store python's /post response body. Returns the post id.
+     */
+    public function store(int $authorId, string $text, array $body): int
+    {
+        $rootSig = $body['root_sig'];
+        $chunks  = $body['chunks'] ?? [];
+        $now     = now();
+
+        $postId = DB::transaction(function () use ($authorId, $text, $body, $rootSig, $chunks, $now) {
+            DB::table('posts')->insertOrIgnore([
+                'author_id'               => $authorId,
+                'seq'                     => $body['seq'] ?? null,
+                'root_signature'          => $rootSig,
+                'first_slot'              => 0,
+                'first_block_time'        => $now,
+                'content_short'           => mb_substr($text, 0, 200),
+                'content_full'            => $text,
+                'reply_to_root_signature' => null,
+                'likes_count'             => 0,
+                'comments_count'          => 0,
+                'created_at'              => $now,
+                'updated_at'              => $now,
+            ]);
+
+            $postId = (int) DB::table('posts')->where('root_signature', $rootSig)->value('id');
+
+            DB::table('post_chunks')->insertOrIgnore(array_map(fn ($chunk) => [
+                'post_id'      => $postId,
+                'chunk_index'  => $chunk['index'],
+                'tx_signature' => $chunk['tx_signature'],
+                'slot'         => 0,
+                'block_time'   => $now,
+                'content'      => $chunk['content_utf8'],
+                'created_at'   => $now,
+                'updated_at'   => $now,
+            ], $chunks));
+
+            return $postId;
+        });
+
+        // new post -> cached feed pages are stale
+        Feed::invalidate();
+
+        return $postId;
+    }
+
+    /**
+     * Remember a queued post until its result is stored.
+     */
+    public function pending(string $commandId, int $authorId, string $text): void
+    {
+        Redis::connection('sol')->hset(self::PENDING_KEY, $commandId, json_encode([
+            'author_id' => $authorId,
+            'text'      => $text,
+            'at'        => time(),
+        ]));
+    }
+
+    /**
+     * The result for $commandId arrived: store it if it was a pending
+     * post. Returns the post id, or null (not a pending post / failed).
+     */
+    public function settle(string $commandId, array $body, int $status): ?int
+    {
+        try {
+            $raw = Redis::connection('sol')->hget(self::PENDING_KEY, $commandId);
+        } catch (\Throwable $e) {
+            return null;
+        }
+        if (!$raw) {
+            return null;
+        }
+
+        $p = json_decode($raw, true);
+        $postId = null;
+        if ($status === 200 && ($body['ok'] ?? false)) {
+            $postId = $this->store((int) $p['author_id'], (string) $p['text'], $body);
+        } else {
+            Log::warning('queued post failed', ['command_id' => $commandId, 'status' => $status]);
+        }
+
+        Redis::connection('sol')->hdel(self::PENDING_KEY, $commandId);
+
+        return $postId;
+    }
+
+    /**
+     * Settle every pending post whose result is in by now.
+     *
+     * @return int posts stored
+     */
+    public function collect(SolCommandBus $bus): int
+    {
+        $stored = 0;
+
+        foreach (Redis::connection('sol')->hgetall(self::PENDING_KEY) ?: [] as $commandId => $raw) {
+            $result = $bus->result($commandId);
+            if ($result !== null) {
+                [$body, $status] = $result;
+                $stored += $this->settle($commandId, $body, $status) !== null ? 1 : 0;
+                continue;
+            }
+
+            // result expired (or never came): nothing left to store it from
+            if (time() - (int) (json_decode($raw, true)['at'] ?? 0) > self::PENDING_MAX_AGE) {
+                Log::error('queued post never got a result', ['command_id' => $commandId]);
+                Redis::connection('sol')->hdel(self::PENDING_KEY, $commandId);
+            }
+        }
+
+        return $stored;
+    }
+}
@@ -0,0 +1,205 @@
+<?php
+
+namespace App\Services;
+
+use App\Models\User;
+use Illuminate\Support\Collection;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Http;
+use Illuminate\Support\Facades\Log;
+
+/**
+ * Mirrors every user's PDA (username, counters, balance) into the
+ * users.onchain_* columns, so profile pages render from the row
+ * instead of asking python / the RPC per view.
+ *
+ * Pages through users with a wallet, reads each page with one
+ * /read-users call (python batches getMultipleAccounts) and writes
+ * only the rows whose values changed, one UPDATE per page.
+ *
+ * A normal run only reads dirty users (onchain_synced_at null: never
+ * synced, or forget() after one of our own writes); run(all: true) is
+ * the full sweep that picks up changes made outside this app.
+ */
+class ProfileStatsSync
+{
+    // users per /read-users call, python caps it at READ_USERS_MAX
+    private const PAGE_SIZE = 500;
+
+    private const LAMPORTS_PER_SOL = 1_000_000_000;
+
+    // synced columns, in UPDATE order; the username is the only string
+    private const INT_COLUMNS = [
+        'onchain_posts_created',
+        'onchain_likes_received',
+        'onchain_likes_given',
+        'onchain_balance_lamports',
+    ];
+
+    private function base(): string
+    {
+        return rtrim(config('services.sol.base'), '/');
+    }
+
+    /**
+     * @return array{checked: int, changed: int, failed: int}
+     */
+    public function run(bool $all = false): array
+    {
+        $stats = ['checked' => 0, 'changed' => 0, 'failed' => 0];
+
+        DB::table('users')
+            ->whereNotNull('wallet')
+            ->where('wallet', '!=', '')
+            ->when(!$all, fn ($q) => $q->whereNull('onchain_synced_at'))
+            ->select(['id', 'wallet', 'onchain_username', ...self::INT_COLUMNS, 'onchain_synced_at'])
+            ->chunkById(self::PAGE_SIZE, function (Collection $rows) use (&$stats) {
+                $fresh = $this->read($rows->pluck('wallet')->unique()->values()->all());
+                if ($fresh === null) {
+                    // python / RPC down: keep what we have, try again next run
+                    $stats['failed'] += $rows->count();
+                    return;
+                }
+
+                $changes = [];
+                foreach ($rows as $row) {
+                    if (!isset($fresh[$row->wallet])) {
+                        continue; // not a pubkey
+                    }
+                    $stats['checked']++;
+
+                    $new = $this->columns($fresh[$row->wallet]);
+                    if ($row->onchain_synced_at === null || $this->differs($row, $new)) {
+                        $changes[$row->id] = $new;
+                    }
+                }
+
+                $this->write($changes);
+                $stats['changed'] += count($changes);
+            });
+
+        return $stats;
+    }
+
+    /**
+     * Stats shaped like WalletStats::get() from the synced columns,
+     * or null if the job hasn't reached this user yet.
+     */
+    public static function local(User $user): ?array
+    {
+        if ($user->onchain_synced_at === null) {
+            return null;
+        }
+
+        return [
+            'username'       => $user->onchain_username,
+            'posts_created'  => $user->onchain_posts_created ?? 0,
+            'likes_received' => $user->onchain_likes_received ?? 0,
+            'likes_given'    => $user->onchain_likes_given ?? 0,
+            'balance_sol'    => ($user->onchain_balance_lamports ?? 0) / self::LAMPORTS_PER_SOL,
+            'exists'         => $user->onchain_username !== null,
+        ];
+    }
+
+    /**
+     * After our own write to these wallets' PDAs: read them from the
+     * live snapshot again until the next run has synced them.
+     */
+    public static function forget(string ...$wallets): void
+    {
+        $wallets = array_values(array_filter($wallets));
+        if (!$wallets) {
+            return;
+        }
+
+        DB::table('users')->whereIn('wallet', $wallets)->update(['onchain_synced_at' => null]);
+    }
+
+    /**
+     * wallet => /read-users entry, or null if the call failed.
+     */
+    private function read(array $wallets): ?array
+    {
+        try {
+            $resp = Http::timeout(30)->post($this->base() . '/read-users', ['owners' => $wallets]);
+        } catch (\Throwable $e) {
+            Log::warning('profiles:sync read failed', ['error' => $e->getMessage()]);
+            return null;
+        }
+
+        if (!$resp->ok() || !$resp->json('ok')) {
+            Log::warning('profiles:sync read failed', ['status' => $resp->status()]);
+            return null;
+        }
+
+        return $resp->json('users') ?: [];
+    }
+
+    private function columns(array $u): array
+    {
+        $exists = (bool) ($u['exists'] ?? false);
+
+        return [
+            // null username = no PDA
+            'onchain_username'         => $exists ? (string) ($u['username'] ?? '') : null,
+            'onchain_posts_created'    => (int) ($u['posts_created'] ?? 0),
+            'onchain_likes_received'   => (int) ($u['likes_received'] ?? 0),
+            'onchain_likes_given'      => (int) ($u['likes_given'] ?? 0),
+            'onchain_balance_lamports' => (int) ($u['lamports'] ?? 0),
+        ];
+    }
+
+    private function differs(object $row, array $new): bool
+    {
+        if ($row->onchain_username !== $new['onchain_username']) {
+            return true;
+        }
+
+        foreach (self::INT_COLUMNS as $col) {
+            if ($row->{$col} === null || (int) $row->{$col} !== $new[$col]) {
+                return true;
+            }
+        }
+
+        return false;
+    }
+
+    /**
+     * One UPDATE ... SET col = CASE id ... END for every changed row.
+     *
+     * @param array<int, array> $changes user id => columns()
+     */
+    private function write(array $changes): void
+    {
+        if (!$changes) {
+            return;
+        }
+
+        // ids and counters are ints we built above, safe to inline;
+        // usernames come from the chain, so those are bound
+        $bindings = [];
+        $usernames = '';
+        foreach ($changes as $id => $c) {
+            $usernames .= sprintf(' WHEN %d THEN ?', $id);
+            $bindings[] = $c['onchain_username'];
+        }
+        $sets = ['onchain_username = CASE id' . $usernames . ' ELSE onchain_username END'];
+
+        foreach (self::INT_COLUMNS as $col) {
+            $cases = '';
+            foreach ($changes as $id => $c) {
+                $cases .= sprintf(' WHEN %d THEN %d', $id, $c[$col]);
+            }
+            $sets[] = $col . ' = CASE id' . $cases . ' ELSE ' . $col . ' END';
+        }
+
+        $sets[] = 'onchain_synced_at = ?';
+        $bindings[] = now();
+
+        DB::update(
+            'UPDATE users SET ' . implode(', ', $sets)
+                . ' WHERE id IN (' . implode(',', array_map('intval', array_keys($changes))) . ')',
+            $bindings,
+        );
+    }
+}
@@ -0,0 +1,84 @@
+<?php
+
+namespace App\Services;
+
+use Illuminate\Support\Facades\Log;
+use Illuminate\Support\Facades\Redis;
+use Illuminate\Support\Str;
+
+/**
+ * Redis-stream transport to the python sol service.
+ *
+ * Commands are XADDed to sol:commands; a consumer group inside the
+ * python service runs them (see sol-client/command_bus.py) and pushes
+ * { status, body } to sol:cmd_result:{id}, the same thing the HTTP
+ * endpoint would have answered.
+ */
+class SolCommandBus
+{
+    // keep in sync with sol-client/command_bus.py
+    private const STREAM        = 'sol:commands';
+    private const RESULT_PREFIX = 'sol:cmd_result:';
+
+    // cap the stream, acked entries don't need to live forever
+    private const MAX_LEN = 100000;
+
+    public function enabled(): bool
+    {
+        return config('services.sol.transport') === 'stream';
+    }
+
+    /**
+     * Queue a command. Returns its id, or null if Redis is unavailable
+     * (caller falls back to HTTP).
+     */
+    public function enqueue(string $command, array $payload): ?string
+    {
+        $id = (string) Str::uuid();
+
+        $fields = [
+            'id'      => $id,
+            'command' => $command,
+            'payload' => json_encode($payload),
+        ];
+        // continue this request's trace in the python consumer
+        if ($traceparent = app(Tracer::class)->traceparent()) {
+            $fields['traceparent'] = $traceparent;
+        }
+
+        try {
+            Redis::connection('sol')->xadd(self::STREAM, '*', $fields, self::MAX_LEN, true);
+        } catch (\Throwable $e) {
+            Log::warning('sol command enqueue failed, falling back to http', [
+                'command' => $command,
+                'error'   => $e->getMessage(),
+            ]);
+            return null;
+        }
+
+        return $id;
+    }
+
+    /**
+     * Non-blocking peek for GET /sol/command/{id} and posts:collect.
+     *
+     * @return array{0: array, 1: int}|null
+     */
+    public function result(string $id): ?array
+    {
+        try {
+            $raw = Redis::connection('sol')->lindex(self::RESULT_PREFIX . $id, 0);
+        } catch (\Throwable $e) {
+            return null;
+        }
+
+        return $raw ? $this->decode($raw) : null;
+    }
+
+    private function decode(string $raw): array
+    {
+        $res = json_decode($raw, true) ?: [];
+
+        return [$res['body'] ?? [], (int) ($res['status'] ?? 500)];
+    }
+}
@@ -0,0 +1,270 @@
+<?php
+
+namespace App\Services;
+
+use Illuminate\Http\Request;
+use Illuminate\Support\Facades\Http;
+use Illuminate\Support\Facades\Log;
+
+use function Illuminate\Support\defer;
+
+/**
+ * Minimal W3C trace context for one request, shared with the python
+ * service (sol-client/tracing.py).
+ *
+ * TraceRequests opens the root span, outgoing Http calls to our own
+ * services carry `traceparent` and get a span each, DB queries are
+ * recorded as `db <verb>` spans. When the request ends:
+ *
+ * - sampled (caller's flag, or trace.sample_rate for new traces)
+ *   -> exported as OTLP/JSON: a JSON-lines file or an OTLP/HTTP collector
+ * - slower than trace.slow_ms (kept with trace.slow_sample_rate)
+ *   -> one log line with the per-span timing breakdown
+ */
+class Tracer
+{
+    private ?string $traceId = null;
+    private bool $sampled = false;
+
+    /** @var array<string, array> span id => span */
+    private array $spans = [];
+
+    /** @var string[] open span ids, innermost last */
+    private array $stack = [];
+
+    private int $originUnixNs = 0;
+    private int $originHr = 0;
+
+    public function start(Request $req): void
+    {
+        $this->originUnixNs = (int) (microtime(true) * 1e9);
+        $this->originHr = hrtime(true);
+
+        $parent = null;
+        if (preg_match('/^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$/', strtolower(trim((string) $req->header('traceparent'))), $m)
+            && $m[1] !== str_repeat('0', 32) && $m[2] !== str_repeat('0', 16)) {
+            $this->traceId = $m[1];
+            $parent = $m[2];
+            $this->sampled = (bool) (hexdec($m[3]) & 1);
+        } else {
+            $this->traceId = bin2hex(random_bytes(16));
+            $this->sampled = mt_rand() / mt_getrandmax() < (float) config('services.trace.sample_rate');
+        }
+
+        $this->begin($req->method() . ' ' . $req->path(), [
+            'http.method' => $req->method(),
+            'http.target' => '/' . ltrim($req->path(), '/'),
+        ], $parent, kind: 2);
+    }
+
+    public function active(): bool
+    {
+        return $this->traceId !== null && $this->stack !== [];
+    }
+
+    /**
+     * Run $fn inside a child span.
+     */
+    public function span(string $name, callable $fn, array $attrs = []): mixed
+    {
+        if (!$this->active()) {
+            return $fn();
+        }
+
+        $id = $this->begin($name, $attrs);
+        try {
+            return $fn();
+        } catch (\Throwable $e) {
+            $this->spans[$id]['error'] = get_class($e) . ': ' . $e->getMessage();
+            throw $e;
+        } finally {
+            $this->end($id);
+        }
+    }
+
+    public function begin(string $name, array $attrs = [], ?string $parent = null, int $kind = 1): ?string
+    {
+        if ($this->traceId === null) {
+            return null;
+        }
+
+        $id = bin2hex(random_bytes(8));
+        $this->spans[$id] = [
+            'name'   => $name,
+            'parent' => $parent ?? (end($this->stack) ?: null),
+            'kind'   => $kind,
+            'attrs'  => $attrs,
+            'start'  => hrtime(true),
+            'end'    => null,
+            'error'  => null,
+        ];
+        $this->stack[] = $id;
+
+        return $id;
+    }
+
+    public function end(?string $id, array $attrs = [], ?string $error = null): void
+    {
+        if ($id === null || !isset($this->spans[$id])) {
+            return;
+        }
+
+        $this->spans[$id]['end'] = hrtime(true);
+        $this->spans[$id]['attrs'] += $attrs;
+        $this->spans[$id]['error'] ??= $error;
+        $this->stack = array_values(array_filter($this->stack, fn ($s) => $s !== $id));
+    }
+
+    /**
+     * A span that already happened (e.g. a query Laravel timed for us).
+     */
+    public function record(string $name, float $ms, array $attrs = []): void
+    {
+        if (!$this->active()) {
+            return;
+        }
+
+        $now = hrtime(true);
+        $this->spans[bin2hex(random_bytes(8))] = [
+            'name'   => $name,
+            'parent' => end($this->stack) ?: null,
+            'kind'   => 1,
+            'attrs'  => $attrs,
+            'start'  => $now - (int) ($ms * 1e6),
+            'end'    => $now,
+            'error'  => null,
+        ];
+    }
+
+    /**
+     * Header value for an outgoing call made from the current span.
+     */
+    public function traceparent(): ?string
+    {
+        if (!$this->active()) {
+            return null;
+        }
+
+        return sprintf('00-%s-%s-%s', $this->traceId, end($this->stack), $this->sampled ? '01' : '00');
+    }
+
+    /**
+     * Close the root span, export / log, forget everything.
+     */
+    public function finish(int $status): void
+    {
+        if (!$this->active()) {
+            return;
+        }
+
+        $rootId = $this->stack[0];
+        foreach (array_reverse($this->stack) as $id) {
+            $this->end($id);
+        }
+        $this->spans[$rootId]['attrs']['http.status_code'] = $status;
+
+        $ms = ($this->spans[$rootId]['end'] - $this->spans[$rootId]['start']) / 1e6;
+        if ($ms >= (float) config('services.trace.slow_ms')
+            && mt_rand() / mt_getrandmax() < (float) config('services.trace.slow_sample_rate')) {
+            Log::warning('slow request: ' . $this->breakdown($rootId, $ms));
+        }
+
+        if ($this->sampled) {
+            $this->export();
+        }
+
+        $this->traceId = null;
+        $this->spans = [];
+        $this->stack = [];
+    }
+
+    /**
+     * "POST sol/post 2480ms trace=… | http POST /post 2310ms, db insert x4 9ms, validate 1ms"
+     * Spans with the same name are summed; biggest first.
+     */
+    private function breakdown(string $rootId, float $ms): string
+    {
+        $totals = [];
+        foreach ($this->spans as $id => $s) {
+            if ($id === $rootId) {
+                continue;
+            }
+            $totals[$s['name']] ??= [0, 0.0];
+            $totals[$s['name']][0]++;
+            $totals[$s['name']][1] += ($s['end'] - $s['start']) / 1e6;
+        }
+        uasort($totals, fn ($a, $b) => $b[1] <=> $a[1]);
+
+        $parts = [];
+        foreach ($totals as $name => [$n, $t]) {
+            $parts[] = sprintf('%s%s %dms', $name, $n > 1 ? " x{$n}" : '', $t);
+        }
+
+        return sprintf('%s %dms trace=%s | %s', $this->spans[$rootId]['name'], $ms, $this->traceId, implode(', ', $parts));
+    }
+
+    private function export(): void
+    {
+        $exporter = config('services.trace.export');
+        if (!$exporter) {
+            return;
+        }
+
+        $body = $this->otlpPayload();
+
+        // after the response is sent, the collector may be slow
+        defer(function () use ($exporter, $body) {
+            try {
+                if ($exporter === 'file') {
+                    file_put_contents(config('services.trace.file'), json_encode($body) . "\n", FILE_APPEND | LOCK_EX);
+                } elseif ($exporter === 'otlp') {
+                    Http::timeout(2)->post(rtrim(config('services.trace.otlp_endpoint'), '/') . '/v1/traces', $body);
+                }
+            } catch (\Throwable $e) {
+                // tracing must never break a request
+            }
+        });
+    }
+
+    private function otlpPayload(): array
+    {
+        $value = fn ($v) => match (true) {
+            is_bool($v)  => ['boolValue' => $v],
+            is_int($v)   => ['intValue' => (string) $v],
+            is_float($v) => ['doubleValue' => $v],
+            default      => ['stringValue' => (string) $v],
+        };
+        $unixNs = fn (int $hr) => (string) ($this->originUnixNs + $hr - $this->originHr);
+
+        $spans = [];
+        foreach ($this->spans as $id => $s) {
+            $span = [
+                'traceId'           => $this->traceId,
+                'spanId'            => $id,
+                'name'              => $s['name'],
+                'kind'              => $s['kind'],
+                'startTimeUnixNano' => $unixNs($s['start']),
+                'endTimeUnixNano'   => $unixNs($s['end'] ?? hrtime(true)),
+                'attributes'        => array_map(
+                    fn ($k, $v) => ['key' => $k, 'value' => $value($v)],
+                    array_keys($s['attrs']),
+                    $s['attrs'],
+                ),
+                'status'            => $s['error'] ? ['code' => 2, 'message' => $s['error']] : ['code' => 1],
+            ];
+            if ($s['parent']) {
+                $span['parentSpanId'] = $s['parent'];
+            }
+            $spans[] = $span;
+        }
+
+        return [
+            'resourceSpans' => [[
+                'resource'   => ['attributes' => [
+                    ['key' => 'service.name', 'value' => ['stringValue' => config('services.trace.service_name')]],
+                ]],
+                'scopeSpans' => [['scope' => ['name' => 'laravel'], 'spans' => $spans]],
+            ]],
+        ];
+    }
+}
@@ -0,0 +1,157 @@
+<?php
+
+namespace App\Services;
+
+use Illuminate\Support\Facades\Cache;
+use Illuminate\Support\Facades\Http;
+use Illuminate\Support\Facades\Log;
+use Illuminate\Support\Facades\Redis;
+
+use function Illuminate\Support\defer;
+
+/**
+ * On-chain wallet stats (username, counters, PDA balance) for the UI.
+ *
+ * The python service pushes a snapshot into Redis whenever it reads or
+ * changes a user PDA (see sol-client/wallet_stats.py), so page renders
+ * read Redis instead of doing HTTP -> python -> RPC every time.
+ *
+ * Stale-while-revalidate: an old snapshot is still returned, and a
+ * refresh through python runs after the response is sent.
+ */
+class WalletStats
+{
+    // keep in sync with KEY_PREFIX in sol-client/wallet_stats.py
+    private const KEY_PREFIX = 'sol:wallet_stats:';
+
+    // snapshots younger than this are served without a refresh
+    private const FRESH_SECONDS = 15;
+
+    // how long we keep a snapshot we fetched ourselves
+    private const TTL_SECONDS = 86400;
+
+    private function base(): string
+    {
+        return rtrim(config('services.sol.base'), '/');
+    }
+
+    public static function defaults(): array
+    {
+        return [
+            'username'        => null,
+            'posts_created'   => 0,
+            'likes_received'  => 0,
+            'likes_given'     => 0,
+            'balance_sol'     => 0,
+            'exists'          => false,
+        ];
+    }
+
+    /**
+     * Snapshot from Redis if we have one, otherwise a synchronous fetch.
+     */
+    public function get(?string $wallet): array
+    {
+        return app(Tracer::class)->span('wallet_stats', fn () => $this->lookup($wallet));
+    }
+
+    private function lookup(?string $wallet): array
+    {
+        if (!$wallet) {
+            return self::defaults();
+        }
+
+        $snap = $this->readSnapshot($wallet);
+        if ($snap === null) {
+            return $this->fetch($wallet);
+        }
+
+        if (time() - (int) ($snap['updated_at'] ?? 0) > self::FRESH_SECONDS) {
+            $this->refreshAfterResponse($wallet);
+        }
+
+        return $this->shape($snap);
+    }
+
+    /**
+     * Ask python /read-user right now (it republishes the snapshot too)
+     * and store what we got. Falls back to defaults on any failure.
+     */
+    public function fetch(string $wallet): array
+    {
+        try {
+            $resp = Http::timeout(5)->get($this->base() . '/read-user/' . $wallet);
+        } catch (\Throwable $e) {
+            Log::warning('wallet stats fetch failed', ['wallet' => $wallet, 'error' => $e->getMessage()]);
+            return self::defaults();
+        }
+
+        if ($resp->status() === 404) {
+            $stats = self::defaults();
+            $this->writeSnapshot($wallet, $stats);
+            return $stats;
+        }
+
+        if (!$resp->ok() || !$resp->json('ok')) {
+            return self::defaults();
+        }
+
+        $stats = $this->shape([...$resp->json('user'), 'exists' => true]);
+        $this->writeSnapshot($wallet, $stats);
+
+        return $stats;
+    }
+
+    private function refreshAfterResponse(string $wallet): void
+    {
+        // one refresh in flight per wallet, however many pages render meanwhile
+        if (!Cache::add('wallet_stats_refresh:' . $wallet, 1, 10)) {
+            return;
+        }
+
+        defer(fn () => $this->fetch($wallet));
+    }
+
+    private function readSnapshot(string $wallet): ?array
+    {
+        try {
+            $raw = Redis::connection('sol')->get(self::KEY_PREFIX . $wallet);
+        } catch (\Throwable $e) {
+            // redis down / extension missing -> behave like before (HTTP)
+            return null;
+        }
+
+        if (!$raw) {
+            return null;
+        }
+
+        $snap = json_decode($raw, true);
+
+        return is_array($snap) ? $snap : null;
+    }
+
+    private function writeSnapshot(string $wallet, array $stats): void
+    {
+        try {
+            Redis::connection('sol')->setex(
+                self::KEY_PREFIX . $wallet,
+                self::TTL_SECONDS,
+                json_encode([...$stats, 'updated_at' => time()]),
+            );
+        } catch (\Throwable $e) {
+            // not fatal, next render just fetches again
+        }
+    }
+
+    private function shape(array $u): array
+    {
+        return [
+            'username'        => $u['username']        ?? null,
+            'posts_created'   => $u['posts_created']   ?? 0,
+            'likes_received'  => $u['likes_received']  ?? 0,
+            'likes_given'     => $u['likes_given']     ?? 0,
+            'balance_sol'     => $u['balance_sol']     ?? 0,
+            'exists'          => (bool) ($u['exists'] ?? false),
+        ];
+    }
+}
@@ -28,6 +28,46 @@
         'key' => env('RESEND_KEY'),
     ],
 
+    'sol' => [
+        'base'      => env('SOL_SERVICE_BASE', 'http://host.docker.internal:8001'),
+        // http: call base directly
+        // stream: XADD to the redis command stream, http only as fallback
+        'transport' => env('SOL_TRANSPORT', 'http'),
+        'timeout'   => (int) env('SOL_HTTP_TIMEOUT', 30),
+    ],
+
+    'trace' => [
+        // W3C traceparent is always propagated to the python service;
+        // this controls what we keep. export: '' | file | otlp
+        'export'           => env('TRACE_EXPORT', ''),
+        'file'             => env('TRACE_FILE', storage_path('logs/traces.jsonl')),
+        'otlp_endpoint'    => env('OTEL_EXPORTER_OTLP_ENDPOINT', 'http://localhost:4318'),
+        'service_name'     => env('OTEL_SERVICE_NAME', 'laravel'),
+        'sample_rate'      => (float) env('TRACE_SAMPLE_RATE', 0.1),
+        // requests slower than this log a timing breakdown
+        'slow_ms'          => (float) env('TRACE_SLOW_MS', 1000),
+        'slow_sample_rate' => (float) env('TRACE_SLOW_SAMPLE_RATE', 1.0),
+    ],
+
+    'media' => [
+        // sol-client/media_service.py; empty = store originals locally
+        'base' => env('MEDIA_SERVICE_BASE'),
+    ],
+
+    'feed' => [
+        // cached feed pages + version key; null = the default cache store
+        'cache_store' => env('FEED_CACHE_STORE'),
+    ],
+
+    'tenor' => [
+        // Tenor v1 key (demo default is fine for tests)
+        'key'     => env('TENOR_API_KEY', 'LIVDSRZULELA'),
+        'base'    => env('TENOR_BASE', 'https://g.tenor.com/v1'),
+        'timeout' => (int) env('TENOR_TIMEOUT', 4),
+        // search results / trending; null = the default cache store
+        'cache_store' => env('GIF_CACHE_STORE'),
+    ],
+
     'slack' => [
         'notifications' => [
             'bot_user_oauth_token' => env('SLACK_BOT_USER_OAUTH_TOKEN'),
@@ -0,0 +1,44 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\DB;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration {
+    public function up(): void {
+        Schema::table('posts', function (Blueprint $table) {
+            // full post text, stitched from post_chunks once on write
+            $table->text('content_full')->nullable()->after('content_short');
+
+            // keyset pagination of the feed: ORDER BY created_at DESC, id DESC
+            $table->index(['created_at', 'id']);
+        });
+
+        // backfill existing posts from their chunks
+        DB::table('posts')->whereNull('content_full')->orderBy('id')->chunkById(500, function ($posts) {
+            $chunks = DB::table('post_chunks')
+                ->whereIn('post_id', $posts->pluck('id')->all())
+                ->orderBy('chunk_index')
+                ->get(['post_id', 'content']);
+
+            $full = [];
+            foreach ($chunks as $c) {
+                $full[$c->post_id] = ($full[$c->post_id] ?? '') . $c->content;
+            }
+
+            foreach ($posts as $p) {
+                DB::table('posts')->where('id', $p->id)->update([
+                    'content_full' => $full[$p->id] ?? ($p->content_short ?? ''),
+                ]);
+            }
+        });
+    }
+
+    public function down(): void {
+        Schema::table('posts', function (Blueprint $table) {
+            $table->dropIndex(['created_at', 'id']);
+            $table->dropColumn('content_full');
+        });
+    }
+};
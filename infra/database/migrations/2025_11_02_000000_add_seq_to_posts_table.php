@@ -0,0 +1,22 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration {
+    public function up(): void {
+        Schema::table('posts', function (Blueprint $table) {
+            // on-chain post id is (owner wallet, seq); python reports likes by it
+            $table->unsignedBigInteger('seq')->nullable()->after('author_id');
+            $table->index(['author_id', 'seq']);
+        });
+    }
+
+    public function down(): void {
+        Schema::table('posts', function (Blueprint $table) {
+            $table->dropIndex(['author_id', 'seq']);
+            $table->dropColumn('seq');
+        });
+    }
+};
@@ -0,0 +1,23 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Database\Schema\Blueprint;
+use Illuminate\Support\Facades\Schema;
+
+return new class extends Migration {
+    public function up(): void {
+        Schema::table('users', function (Blueprint $table) {
+            // PDA balance, kept in lamports so the sync job can diff exactly
+            $table->unsignedBigInteger('onchain_balance_lamports')->nullable()->after('onchain_likes_given');
+
+            // last time profiles:sync wrote this row; null = never synced
+            $table->timestamp('onchain_synced_at')->nullable()->after('onchain_balance_lamports');
+        });
+    }
+
+    public function down(): void {
+        Schema::table('users', function (Blueprint $table) {
+            $table->dropColumn(['onchain_balance_lamports', 'onchain_synced_at']);
+        });
+    }
+};
@@ -60,6 +60,19 @@ function extractMediaUrls(text: string): { imgUrl?: string; gifUrl?: string } {
   return { imgUrl, gifUrl };
 }
 
+// widths the media service renders (keep in sync with WIDTHS in sol-client/media_service.py)
+const MEDIA_WIDTHS = [320, 640, 1280];
+
+// ".../post_media/v/<sha256>/<w>.webp" -> srcset with every smaller variant
+function mediaSrcSet(u: string): string | undefined {
+  const m = u.match(/^(.*\/post_media\/v\/[0-9a-f]{64}\/)(\d+)\.webp$/i);
+  if (!m) return undefined;
+  const [, base, wStr] = m;
+  const top = Number(wStr);
+  const widths = [...MEDIA_WIDTHS.filter((w) => w < top), top];
+  return widths.map((w) => `${base}${w}.webp ${w}w`).join(', ');
+}
+
 function explorerUrl(sig: string) {
   return `https://explorer.solana.com/tx/${sig}?cluster=devnet`;
 }
@@ -204,6 +217,10 @@ export default function PostCard(props: PostCardProps) {
             <div className="mt-3 overflow-hidden rounded-xl ring-1 ring-black/10 dark:ring-white/10">
               <img
                 src={imgUrl}
+                srcSet={mediaSrcSet(imgUrl)}
+                sizes="(max-width: 640px) 100vw, 640px"
+                loading="lazy"
+                decoding="async"
                 alt="attachment"
                 className="w-full max-h-[420px] object-contain bg-black/5 dark:bg-white/5"
               />
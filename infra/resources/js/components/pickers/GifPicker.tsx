@@ -54,8 +54,9 @@ export default function GifPicker({
         if (!cancelled) setLoading(false);
       }
     };
-    run();
-    return () => { cancelled = true; };
+    // wait for a pause in typing instead of searching every keystroke
+    const t = setTimeout(run, q ? 250 : 0);
+    return () => { cancelled = true; clearTimeout(t); };
   }, [q]);
 
   return (
@@ -25,6 +25,7 @@ export type FeedPost = {
   tx?: string;      // root tx signature
   onchain?: boolean;
   pending?: boolean; // true for optimistic posts that haven't come back from server yet
+  paged?: boolean;   // loaded via "Load more" (older than the SSR first page)
 };
 
 type PageProps = {
@@ -45,6 +46,7 @@ type PageProps = {
     tx?: string;   // root_sig
     onchain?: boolean;
   }>;
+  next_cursor?: string | null; // keyset cursor for /api/feed
   auth?: { user?: { id: number; name: string; wallet?: string | null } };
 };
 
@@ -73,6 +75,10 @@ export default function Feed() {
     ssrPostsRaw.map(normalizeFromSSR),
   );
 
+  // cursor for the next (older) page, null when we've reached the end
+  const [cursor, setCursor] = useState<string | null>(props.next_cursor ?? null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
   // when SSR posts update (Inertia reload), reconcile:
   // - take all fresh SSR posts
   // - keep any still-pending optimistic posts that SSR didn't include yet
@@ -156,14 +162,29 @@ export default function Feed() {
         body: JSON.stringify({ username }),
       });
 
-      const j = await res.json().catch(() => ({} as any));
+      let j = await res.json().catch(() => ({} as any));
+      let ok = res.ok && j?.ok;
+      let status = res.statusText;
+
+      if (res.status === 202 && j?.queued) {
+        // stream transport: the tx hasn't been sent yet
+        setInitMsg('Initializing… (queued)');
+        const done = await awaitCommand(j.command_id);
+        if (!done) {
+          setInitMsg('Still processing, check back in a minute.');
+          return;
+        }
+        j = done.j;
+        ok = done.res.ok && j?.ok;
+        status = done.res.statusText;
+      }
 
-      if (res.ok && j?.ok) {
+      if (ok) {
         setOnchainReady('yes');
         setInitMsg(`Initialized ✅ tx: ${j.sig ?? 'n/a'}`);
       } else {
         setOnchainReady('no');
-        setInitMsg(`Failed: ${j?.detail || j?.error || res.statusText}`);
+        setInitMsg(`Failed: ${j?.detail || j?.error || status}`);
       }
     } finally {
       setInitBusy(false);
@@ -192,6 +213,11 @@ export default function Feed() {
 
     const j = await res.json().catch(() => ({} as any));
 
+    if (res.status === 202 && j?.queued) {
+      await awaitQueuedPost(j.command_id, combinedText);
+      return;
+    }
+
     if (!res.ok || !j?.ok) {
       const reason = j?.detail || j?.error || res.statusText;
       alert(`Post failed: ${reason}`);
@@ -240,12 +266,95 @@ export default function Feed() {
     router.reload({ only: ['posts'], preserveScroll: true });
   };
 
+  // stream transport: show the post as pending until its command has run,
+  // then pull the stored row (GET /sol/command/{id} writes it)
+  const awaitQueuedPost = async (commandId: string, text: string) => {
+    const postKey = `cmd-${commandId}`;
+    const dropPending = () =>
+      setFeedPosts((prev) => prev.filter((p) => p.postKey !== postKey));
+
+    setFeedPosts((prev) => [
+      ...prev,
+      {
+        postKey,
+        id: postKey,
+        author: {
+          name: user?.name || 'You',
+          handle: wallet ? wallet.slice(0, 6) : undefined,
+          wallet: wallet || null,
+          avatar_url: null,
+        },
+        text,
+        createdAt: nowIso(),
+        onchain: true,
+        pending: true,
+        likeCount: 0,
+        commentCount: 0,
+        repostCount: 0,
+      },
+    ]);
+
+    const done = await awaitCommand(commandId);
+    if (!done) {
+      // not failed: posts:collect stores it once the result is in
+      dropPending();
+      alert('Post is still processing, it will show up in the feed shortly.');
+      return;
+    }
+
+    const { res, j } = done;
+    if (!res.ok || !j?.ok) {
+      dropPending();
+      const reason = j?.detail || j?.error || res.statusText;
+      alert(`Post failed: ${reason}`);
+      if (String(reason).includes('user_not_found')) {
+        setOnchainReady('no');
+      }
+      return;
+    }
+
+    router.reload({
+      only: ['posts'],
+      preserveScroll: true,
+      onFinish: dropPending,
+    });
+  };
+
   // like stub
   const like = async (id: string | number) => {
     console.log('like', id);
     // TODO: implement /sol/like + update state
   };
 
+  // --- Older pages (keyset cursor) ---
+  const loadMore = async () => {
+    if (!cursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const res = await fetch(`/api/feed?cursor=${encodeURIComponent(cursor)}`, {
+        credentials: 'same-origin',
+        headers: { Accept: 'application/json' },
+      });
+      const j = await res.json().catch(() => ({} as any));
+      if (!res.ok || !j?.ok) return;
+
+      const older: FeedPost[] = (j.posts ?? []).map((p: PageProps['posts'][number]) => ({
+        ...normalizeFromSSR(p),
+        paged: true,
+      }));
+      setFeedPosts((prev) => {
+        const map = new Map(prev.map((p) => [p.postKey, p]));
+        for (const p of older) {
+          if (!map.has(p.postKey)) map.set(p.postKey, p);
+        }
+        return Array.from(map.values());
+      });
+      setCursor(j.next_cursor ?? null);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // newest-first feed
   const sortedFeed = useMemo(() => {
     return [...feedPosts].sort(
@@ -311,6 +420,14 @@ export default function Feed() {
             onShare={(id) => console.log('share', id)}
           />
         ))}
+
+        {cursor && (
+          <div className="flex justify-center">
+            <Button onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Loading…' : 'Load more'}
+            </Button>
+          </div>
+        )}
       </div>
     </>
   );
@@ -320,6 +437,36 @@ Feed.layout = (page: any) => <AppLayout>{page}</AppLayout>;
 
 /* ---------- helpers ---------- */
 
+// how long we poll a queued command before leaving it to the server
+const COMMAND_POLL_MS = 120_000;
+
+/**
+ * Poll GET /sol/command/{id} until the queued command has a result.
+ * Returns null if it is still pending after COMMAND_POLL_MS.
+ */
+async function awaitCommand(
+  id: string,
+): Promise<{ res: Response; j: any } | null> {
+  const deadline = Date.now() + COMMAND_POLL_MS;
+  for (let delay = 500; Date.now() < deadline; delay = Math.min(delay * 2, 4000)) {
+    await new Promise((r) => setTimeout(r, delay));
+    try {
+      const res = await fetch(`/sol/command/${encodeURIComponent(id)}`, {
+        credentials: 'same-origin',
+        headers: { Accept: 'application/json' },
+      });
+      const j = await res.json().catch(() => ({} as any));
+      if (!(res.status === 202 && j?.pending)) {
+        return { res, j };
+      }
+    } catch (err) {
+      // network blip: the command keeps running, try again
+      console.warn('[Feed] /sol/command poll error', err);
+    }
+  }
+  return null;
+}
+
 // normalize a server post (SSR) into FeedPost
 function normalizeFromSSR(p: PageProps['posts'][number]): FeedPost {
   const postKey = p.tx || String(p.id); // prefer root_sig if present
@@ -345,6 +492,7 @@ function normalizeFromSSR(p: PageProps['posts'][number]): FeedPost {
  * Goal:
  *   - let fresh SSR posts (canonical DB rows) win
  *   - keep any optimistic pending post the server doesn't know yet
+ *   - keep older pages the user already loaded with "Load more"
  */
 function reconcileAfterSSR(prev: FeedPost[], freshSSR: FeedPost[]): FeedPost[] {
   const freshMap = new Map<string, FeedPost>();
@@ -352,7 +500,7 @@ function reconcileAfterSSR(prev: FeedPost[], freshSSR: FeedPost[]): FeedPost[] {
     freshMap.set(p.postKey, p);
   }
   for (const old of prev) {
-    if (old.pending && !freshMap.has(old.postKey)) {
+    if ((old.pending || old.paged) && !freshMap.has(old.postKey)) {
       freshMap.set(old.postKey, old);
     }
   }
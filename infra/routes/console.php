@@ -1,8 +1,45 @@
 <?php
 
+use App\Services\GifSearch;
+use App\Services\LikeCounterFlush;
+use App\Services\PostStore;
+use App\Services\ProfileStatsSync;
+use App\Services\SolCommandBus;
 use Illuminate\Foundation\Inspiring;
 use Illuminate\Support\Facades\Artisan;
+use Illuminate\Support\Facades\Schedule;
 
 Artisan::command('inspire', function () {
     $this->comment(Inspiring::quote());
 })->purpose('Display an inspiring quote');
+
+// batched posts.likes_count updates from the python like ingest
+Artisan::command('likes:flush', function (LikeCounterFlush $flush) {
+    $this->info('posts updated: ' . $flush->run());
+})->purpose('Apply buffered like counts from Redis to posts.likes_count');
+
+Schedule::command('likes:flush')->everyTenSeconds()->withoutOverlapping();
+
+// posts whose stream result came after /sol/post stopped waiting
+Artisan::command('posts:collect', function (PostStore $posts, SolCommandBus $bus) {
+    $this->info('posts stored: ' . $posts->collect($bus));
+})->purpose('Store queued posts whose sol command result has arrived');
+
+Schedule::command('posts:collect')->everyTenSeconds()->withoutOverlapping();
+
+// keep trending GIFs + trending search terms warm for the picker
+Artisan::command('gif:prefetch', function (GifSearch $gifs) {
+    $this->info('entries warmed: ' . $gifs->prefetchTrending());
+})->purpose('Prefetch trending GIF results into the cache');
+
+Schedule::command('gif:prefetch')->everyTenMinutes()->withoutOverlapping();
+
+// mirror users' PDAs into users.onchain_*, profile pages read those:
+// every minute the ones our own writes made dirty, hourly everyone
+Artisan::command('profiles:sync {--all : Check every user, not just the dirty ones}', function (ProfileStatsSync $sync) {
+    $r = $sync->run((bool) $this->option('all'));
+    $this->info("users checked: {$r['checked']}, updated: {$r['changed']}, failed: {$r['failed']}");
+})->purpose('Refresh on-chain profile stats, writing only changed rows');
+
+Schedule::command('profiles:sync')->everyMinute()->withoutOverlapping();
+Schedule::command('profiles:sync --all')->hourly()->withoutOverlapping();
@@ -2,12 +2,13 @@
 
 use Illuminate\Support\Facades\Route;
 use Illuminate\Support\Facades\Auth;
-use Illuminate\Support\Facades\DB;
 use Inertia\Inertia;
 use App\Http\Controllers\WalletAuthController;
 use App\Http\Controllers\SolanaController;
 use App\Http\Controllers\ProfileController;
 use App\Http\Controllers\GifController;
+use App\Services\Feed;
+use Illuminate\Http\Request;
 use Carbon\Carbon;
 
 /**
@@ -81,74 +82,47 @@ function human_time_for_feed(Carbon $ts): string {
     // read / status
     Route::get('/sol/user/{wallet}', [SolanaController::class, 'readUser']);
     Route::get('/sol/post/{sig}',    [SolanaController::class, 'readPost']);
+    Route::get('/sol/command/{id}',  [SolanaController::class, 'command']);
 
     Route::post('/sol/deposit', [SolanaController::class, 'deposit']);
     Route::post('/sol/withdraw', [SolanaController::class, 'withdraw']);
 });
 
-// FEED page (SSR from DB, not from python)
-Route::get('/feed', function () {
-    $authUser = Auth::user();
-
-    // latest 50 posts
-    $rows = DB::table('posts')
-        ->join('users', 'posts.author_id', '=', 'users.id')
-        ->orderByDesc('posts.created_at')
-        ->limit(50)
-        ->get([
-            'posts.id as id',
-            'users.name as author_name',
-            'users.wallet as author_wallet',
-            'posts.root_signature as tx',
-            'posts.created_at as created_at',
-        ]);
-
-    $postIds = $rows->pluck('id')->all();
-
-    // fetch chunks for them
-    $chunks = DB::table('post_chunks')
-        ->whereIn('post_id', $postIds)
-        ->orderBy('chunk_index')
-        ->get([
-            'post_id',
-            'chunk_index',
-            'content',
-        ]);
-
-    // stitch chunks per post
-    $fullTextByPostId = [];
-    foreach ($chunks as $c) {
-        if (!isset($fullTextByPostId[$c->post_id])) {
-            $fullTextByPostId[$c->post_id] = '';
-        }
-        $fullTextByPostId[$c->post_id] .= $c->content;
-    }
-
-    // shape for frontend
-    $posts = $rows->map(function ($row) use ($fullTextByPostId) {
-        $textCombined = $fullTextByPostId[$row->id] ?? '';
-
+/**
+ * shape a Feed row (App\Services\Feed) like PostCard expects
+ */
+if (!function_exists('feed_post_for_ui')) {
+    function feed_post_for_ui(array $row): array {
         return [
-            'id'           => $row->id,
+            'id'           => $row['id'],
             'author'       => [
-                'name'       => $row->author_name,
-                'handle'     => $row->author_wallet ? substr($row->author_wallet, 0, 6) : null,
-                'wallet'     => $row->author_wallet,
+                'name'       => $row['author_name'],
+                'handle'     => $row['author_wallet'] ? substr($row['author_wallet'], 0, 6) : null,
+                'wallet'     => $row['author_wallet'],
                 'avatar_url' => null,
             ],
-            'text'         => $textCombined,
-            'createdAt'    => human_time_for_feed(Carbon::parse($row->created_at)),
+            'text'         => $row['text'],
+            'createdAt'    => human_time_for_feed(Carbon::parse($row['created_at'])),
             'liked'        => false,
-            'likeCount'    => 0,
-            'commentCount' => 0,
+            'likeCount'    => $row['likes_count'],
+            'commentCount' => $row['comments_count'],
             'repostCount'  => 0,
-            'tx'           => $row->tx,
+            'tx'           => $row['tx'],
             'onchain'      => true,
         ];
-    });
+    }
+}
+
+// FEED page (SSR from DB, not from python)
+Route::get('/feed', function () {
+    $authUser = Auth::user();
+
+    // first page (cached, see App\Services\Feed)
+    $page = app(Feed::class)->page();
 
     return Inertia::render('feed', [
-        'posts' => $posts,
+        'posts'       => array_map('feed_post_for_ui', $page['rows']),
+        'next_cursor' => $page['next_cursor'],
         'auth'  => [
             'user' => $authUser
                 ? $authUser->only(['id','name','wallet'])
@@ -157,4 +131,15 @@ function human_time_for_feed(Carbon $ts): string {
     ]);
 });
 
+// older feed pages: /api/feed?cursor=<next_cursor>
+Route::get('/api/feed', function (Request $req) {
+    $page = app(Feed::class)->page($req->query('cursor'));
+
+    return [
+        'ok'          => true,
+        'posts'       => array_map('feed_post_for_ui', $page['rows']),
+        'next_cursor' => $page['next_cursor'],
+    ];
+});
+
 Route::get('/api/gif/search', [GifController::class, 'search']);
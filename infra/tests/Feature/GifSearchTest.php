@@ -0,0 +1,72 @@
+<?php
+
+use Illuminate\Support\Facades\Http;
+
+// local stand-in for Tenor: every call answers with one gif named after the query
+function fakeTenor(): void
+{
+    Http::fake([
+        'g.tenor.com/v1/search*' => fn ($req) => Http::response([
+            'results' => [['media' => [['tinygif' => ['url' => 'https://media.tenor.com/' . $req['q'] . '.gif']]]]],
+        ]),
+        'g.tenor.com/v1/trending?*' => Http::response([
+            'results' => [['media_formats' => ['gif' => ['url' => 'https://media.tenor.com/trending.gif']]]],
+        ]),
+        'g.tenor.com/v1/trending_terms*' => Http::response(['results' => ['Cats', 'dogs']]),
+    ]);
+}
+
+beforeEach(function () {
+    $this->withoutDefer();
+});
+
+test('normalized queries share one upstream call', function () {
+    fakeTenor();
+
+    $this->getJson('/api/gif/search?q=Cats')
+        ->assertOk()
+        ->assertJson(['ok' => true, 'q' => 'cats', 'gifs' => ['https://media.tenor.com/cats.gif'], 'stale' => false]);
+    $this->getJson('/api/gif/search?q=' . urlencode('  cats!! '))->assertOk();
+    $this->getJson('/api/gif/search?q=CATS&limit=5')->assertOk();
+
+    Http::assertSentCount(1);
+});
+
+test('empty query returns trending', function () {
+    fakeTenor();
+
+    $this->getJson('/api/gif/search')
+        ->assertOk()
+        ->assertJson(['gifs' => ['https://media.tenor.com/trending.gif']]);
+});
+
+test('stale entries are served when tenor fails', function () {
+    fakeTenor();
+    $this->getJson('/api/gif/search?q=cats')->assertOk();
+
+    Http::fake(['*' => Http::response('down', 500)]);
+    $this->travel(11)->minutes();
+
+    $this->getJson('/api/gif/search?q=cats')
+        ->assertOk()
+        ->assertJson(['gifs' => ['https://media.tenor.com/cats.gif'], 'stale' => true]);
+});
+
+test('a miss while tenor is down fails fast', function () {
+    Http::fake(['*' => Http::response('down', 500)]);
+
+    $this->getJson('/api/gif/search?q=cats')->assertStatus(503);
+    $this->getJson('/api/gif/search?q=dogs')->assertStatus(503);
+
+    Http::assertSentCount(1);
+});
+
+test('prefetch warms trending and trending terms', function () {
+    fakeTenor();
+
+    $this->artisan('gif:prefetch')->assertSuccessful();
+    Http::assertSentCount(4);
+
+    $this->getJson('/api/gif/search?q=dogs')->assertOk();
+    Http::assertSentCount(4);
+});
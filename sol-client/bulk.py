@@ -0,0 +1,464 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from solana.rpc.async_api import AsyncClient
+from solana.rpc.core import RPCException
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+
+from fastapi import HTTPException
+
+import sol_service as sol
+
+# Bulk admin jobs (seeding users, backfilling posts, mass refunds):
+#
+#   python bulk.py jobs.jsonl --concurrency 16
+#   python bulk.py jobs.csv --dry-run
+#
+# Jobs are the same shapes /nonce/presign takes:
+#
+#   jsonl: {"kind": "deposit", "args": {"owner": "...", "amount_sol": 0.1}}
+#          (or flat: {"kind": "deposit", "owner": "...", "amount_sol": 0.1})
+#   csv:   header row with `kind` + the arg columns, empty cells ignored
+#
+# kinds: init-user | update-user | deposit | withdraw | post | like
+#
+# Instructions of consecutive jobs are packed into as few txs as fit
+# (size + MAX_IXS_PER_TX), a job is never split unless it can't fit in
+# one tx on its own (long posts). Txs touching the same user PDA land
+# in file order: a tx others depend on is confirmed before they are
+# sent, and if it fails they fail too. Everything else runs concurrently.
+#
+# Progress is appended to <jobs>.progress.jsonl (one line per job, plus
+# one per landed part of a long post); re-running skips jobs and parts
+# that already succeeded, so a crash or Ctrl-C just means running the
+# same command again. Without --confirm a tx nothing waits on is only
+# recorded as submitted; the next run looks its sig up
+# (getSignatureStatuses) and sends it again only if it never landed.
+
+# --------- CONFIG ---------
+PACKET_DATA_SIZE = 1232            # max serialized tx size
+MAX_IXS_PER_TX = 8                 # program ixs per tx, keeps CU under build_tx's limit
+BLOCKHASH_MAX_AGE = 30.0           # seconds before we fetch a new one
+REPORT_EVERY = 5.0                 # seconds between progress lines
+SUBMIT_SETTLE = 120.0              # an unconfirmed tx not found this long after sending was dropped
+MAX_SIG_STATUSES = 256             # getSignatureStatuses limit
+
+
+# --------- INPUT ---------
+def read_jobs(path: str) -> Iterator[Tuple[int, sol.PresignJob]]:
+    """
+    (line no, job) for every job in a .jsonl / .csv file.
+    Line numbers are the job ids in the progress file.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            for n, row in enumerate(csv.DictReader(f), start=2):
+                kind = row.pop("kind", "")
+                args = {k: v for k, v in row.items() if k and v not in (None, "")}
+                yield n, sol.PresignJob(kind=kind, args=args)
+        return
+
+    with open(path) as f:
+        for n, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            raw = json.loads(line)
+            if "args" not in raw:
+                raw = {"kind": raw.pop("kind", ""), "args": raw}
+            yield n, sol.PresignJob(**raw)
+
+
+# (job, part) of a sent tx; part is None unless it is a long post's part
+SentKey = Tuple[int, Optional[int]]
+
+
+def load_done(
+    progress_path: str,
+) -> Tuple[Set[int], Dict[int, Set[int]], Dict[SentKey, dict]]:
+    """
+    (finished jobs, job -> landed parts of long posts not finished yet,
+    (job, part) -> {sig, at} of txs sent but never confirmed)
+    """
+    done: Set[int] = set()
+    parts: Dict[int, Set[int]] = {}
+    submitted: Dict[SentKey, dict] = {}
+    if not os.path.exists(progress_path):
+        return done, parts, submitted
+    with open(progress_path) as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # torn last line after a crash
+            status, job = rec.get("status"), rec.get("job")
+            if status == "ok":
+                done.add(job)
+                submitted.pop((job, None), None)
+            elif status == "part_ok":
+                parts.setdefault(job, set()).add(rec["part"])
+                submitted.pop((job, rec["part"]), None)
+            elif status == "submitted":
+                submitted[(job, None)] = rec
+            elif status == "part_submitted":
+                submitted[(job, rec["part"])] = rec
+            elif status == "error":
+                submitted.pop((job, None), None)
+    return done, parts, submitted
+
+
+async def check_submitted(
+    client: AsyncClient,
+    progress_path: str,
+    submitted: Dict[SentKey, dict],
+    done: Set[int],
+    done_parts: Dict[int, Set[int]],
+) -> None:
+    """
+    Look up txs a previous run sent without confirming. Landed ones are
+    recorded ok / part_ok (and added to done / done_parts); failed or
+    dropped ones are left to be sent again. A sig that isn't found yet
+    may still land, so we wait until it is SUBMIT_SETTLE old.
+    """
+    pending = dict(submitted)
+    with open(progress_path, "a") as progress:
+        while pending:
+            keys = list(pending)
+            unseen: List[SentKey] = []
+            for i in range(0, len(keys), MAX_SIG_STATUSES):
+                batch = keys[i : i + MAX_SIG_STATUSES]
+                r = await client.get_signature_statuses(
+                    [Signature.from_string(pending[k]["sig"]) for k in batch],
+                    search_transaction_history=True,
+                )
+                for (job, part), st in zip(batch, r.value):
+                    rec = pending[(job, part)]
+                    if st is None:
+                        if time.time() - rec.get("at", 0) < SUBMIT_SETTLE:
+                            unseen.append((job, part))
+                        continue
+                    if st.err is not None:
+                        continue
+                    if part is None:
+                        done.add(job)
+                        progress.write(json.dumps({"job": job, "status": "ok", "sig": rec["sig"]}) + "\n")
+                    else:
+                        done_parts.setdefault(job, set()).add(part)
+                        progress.write(
+                            json.dumps({"job": job, "status": "part_ok", "part": part, "sig": rec["sig"]}) + "\n"
+                        )
+            progress.flush()
+
+            pending = {k: pending[k] for k in unseen}
+            if pending:
+                oldest = min(rec.get("at", 0) for rec in pending.values())
+                wait = max(SUBMIT_SETTLE - (time.time() - oldest), 1.0)
+                print(f"{len(pending)} unconfirmed tx(s) may still land, checking again in {wait:.0f}s", flush=True)
+                await asyncio.sleep(wait)
+
+
+# --------- PACKING ---------
+class Batch:
+    """
+    One tx worth of instructions + the jobs it finishes.
+    A long post spans several batches (its parts); only its last one
+    completes it.
+    """
+
+    def __init__(self):
+        self.ixs: List[Instruction] = []
+        self.jobs: List[int] = []       # jobs whose last ix is in here
+        self.partial: List[int] = []    # jobs that continue in a later batch
+        self.part: Optional[int] = None # part number, for a long post's batches
+        self.after: List["Batch"] = []  # must land before this one
+        self.blocks = False             # something is in another batch's `after`
+        self.done = asyncio.Event()     # landed (if blocks) / sent, or failed
+        self.sig: Optional[str] = None
+        self.error: Optional[str] = None
+
+    def writable(self) -> Set[Pubkey]:
+        ignore = {sol.ADMIN.pubkey(), *(kp.pubkey() for kp in sol.fee_payers.payers)}
+        return {
+            m.pubkey
+            for ix in self.ixs
+            for m in ix.accounts
+            if m.is_writable and m.pubkey not in ignore
+        }
+
+
+def tx_fits(ixs: List[Instruction]) -> bool:
+    if len(ixs) > MAX_IXS_PER_TX:
+        return False
+    # a payer other than ADMIN means two signatures: the worst-case size
+    payers = sol.fee_payers.payers
+    payer = next((kp for kp in payers if kp.pubkey() != sol.ADMIN.pubkey()), payers[0])
+    return len(bytes(sol.build_tx(ixs, payer, Hash.default()))) <= PACKET_DATA_SIZE
+
+
+def pack(
+    jobs: List[Tuple[int, List[List[Instruction]]]],
+    done_parts: Optional[Dict[int, Set[int]]] = None,
+) -> List[Batch]:
+    """
+    Greedy, in file order. jobs = (job id, job_txs(job)).
+    done_parts: parts of long posts a previous run already landed.
+    """
+    done_parts = done_parts or {}
+    batches: List[Batch] = []
+    cur = Batch()
+
+    def close():
+        nonlocal cur
+        if cur.ixs:
+            batches.append(cur)
+            cur = Batch()
+
+    for job_id, txs in jobs:
+        flat = [ix for tx in txs for ix in tx]
+
+        if tx_fits(cur.ixs + flat):
+            cur.ixs += flat
+            cur.jobs.append(job_id)
+            continue
+
+        close()
+        if tx_fits(flat):
+            cur.ixs = flat
+            cur.jobs.append(job_id)
+            continue
+
+        # doesn't fit in one tx: split its own instructions, in order.
+        # Same split every run, so part numbers survive a resume.
+        parts: List[List[Instruction]] = [[]]
+        for ix in flat:
+            if parts[-1] and not tx_fits(parts[-1] + [ix]):
+                parts.append([])
+            parts[-1].append(ix)
+
+        for n, ixs in enumerate(parts):
+            if n in done_parts.get(job_id, ()):
+                continue
+            cur.ixs, cur.part = ixs, n
+            if n == len(parts) - 1:
+                cur.jobs.append(job_id)
+            else:
+                cur.partial.append(job_id)
+            close()
+
+    close()
+
+    # same PDA -> keep file order
+    last: Dict[Pubkey, Batch] = {}
+    for b in batches:
+        for pk in b.writable():
+            prev = last.get(pk)
+            if prev is not None and prev not in b.after:
+                b.after.append(prev)
+                prev.blocks = True
+            last[pk] = b
+
+    return batches
+
+
+# --------- SENDING ---------
+class Blockhash:
+    """
+    One recent blockhash for every tx we build, refreshed every
+    BLOCKHASH_MAX_AGE seconds instead of fetched per tx.
+    """
+
+    def __init__(self, client: AsyncClient):
+        self.client = client
+        self._value = None
+        self._at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        async with self._lock:
+            if self._value is None or time.monotonic() - self._at > BLOCKHASH_MAX_AGE:
+                r = await self.client.get_latest_blockhash()
+                self._value, self._at = r.value.blockhash, time.monotonic()
+            return self._value
+
+    def expire(self) -> None:
+        self._value = None
+
+
+class Runner:
+    def __init__(self, client: AsyncClient, progress_path: str, concurrency: int, confirm: bool):
+        self.client = client
+        self.blockhash = Blockhash(client)
+        self.sem = asyncio.Semaphore(concurrency)
+        self.confirm = confirm
+        self.progress = open(progress_path, "a")
+        self.started = time.monotonic()
+        self.jobs_ok = 0
+        self.jobs_unconfirmed = 0
+        self.failed: Set[int] = set()
+        self.txs_sent = 0
+
+    def record(self, job_id: int, status: str, **extra) -> None:
+        self.progress.write(json.dumps({"job": job_id, "status": status, **extra}) + "\n")
+        self.progress.flush()
+
+    async def send(self, b: Batch, confirm: bool) -> str:
+        for attempt in range(2):
+            async with sol.fee_payers.lease() as payer:
+                tx = sol.build_tx(b.ixs, payer, await self.blockhash.get())
+                try:
+                    resp = await self.client.send_transaction(tx)
+                except RPCException as e:
+                    # stale blockhash: get a new one and try once more
+                    if attempt == 0 and "Blockhash not found" in str(e):
+                        self.blockhash.expire()
+                        continue
+                    raise
+            sig = str(getattr(resp, "value", resp))
+            if confirm:
+                status = await self.client.confirm_transaction(resp.value, commitment="confirmed")
+                err = status.value[0].err if status.value and status.value[0] else None
+                if err is not None:
+                    raise RuntimeError(f"tx {sig} failed: {err}")
+            return sig
+        raise RuntimeError("unreachable")
+
+    async def run_batch(self, b: Batch) -> None:
+        try:
+            for dep in b.after:
+                await dep.done.wait()
+            failed_dep = next((dep for dep in b.after if dep.error), None)
+            confirmed = self.confirm or b.blocks
+
+            if failed_dep is not None:
+                # would land out of order (or half a post): don't send
+                b.error = f"dependency_failed: {failed_dep.error}"
+            else:
+                async with self.sem:
+                    try:
+                        # others wait for this one to *land*, not just be sent
+                        b.sig = await self.send(b, confirm=confirmed)
+                        self.txs_sent += 1
+                    except Exception as e:
+                        failure = sol.preflight_failure(e) if isinstance(e, RPCException) else None
+                        b.error = json.dumps(failure) if failure else f"{type(e).__name__}: {e}"
+
+            for job_id in b.partial:
+                if b.error and job_id not in self.failed:
+                    self.failed.add(job_id)
+                    self.record(job_id, "error", error=b.error, partial=True)
+                elif not b.error and confirmed:
+                    self.record(job_id, "part_ok", part=b.part, sig=b.sig)
+                elif not b.error:
+                    self.record(job_id, "part_submitted", part=b.part, sig=b.sig, at=time.time())
+            for job_id in b.jobs:
+                if job_id in b.partial or job_id in self.failed:
+                    continue  # long post: reported by its first failed part
+                if b.error:
+                    self.failed.add(job_id)
+                    self.record(job_id, "error", error=b.error)
+                elif confirmed:
+                    self.jobs_ok += 1
+                    self.record(job_id, "ok", sig=b.sig)
+                else:
+                    # may still be dropped: the next run checks the sig
+                    self.jobs_ok += 1
+                    self.jobs_unconfirmed += 1
+                    self.record(job_id, "submitted", sig=b.sig, at=time.time())
+        finally:
+            b.done.set()
+
+    def report(self, total: int, final: bool = False) -> None:
+        secs = max(time.monotonic() - self.started, 1e-6)
+        print(
+            f"{'done' if final else 'progress'}: "
+            f"{self.jobs_ok + len(self.failed)}/{total} jobs "
+            f"({len(self.failed)} failed, {self.jobs_unconfirmed} unconfirmed), {self.txs_sent} txs, "
+            f"{self.jobs_ok / secs:.1f} jobs/s, {self.txs_sent / secs:.1f} tx/s, "
+            f"{secs:.0f}s",
+            flush=True,
+        )
+
+    async def run(self, batches: List[Batch], total: int) -> None:
+        async def reporter():
+            while True:
+                await asyncio.sleep(REPORT_EVERY)
+                self.report(total)
+
+        rep = asyncio.create_task(reporter())
+        try:
+            await asyncio.gather(*(self.run_batch(b) for b in batches))
+        finally:
+            rep.cancel()
+            self.progress.close()
+        self.report(total, final=True)
+
+
+# --------- MAIN ---------
+def build(path: str, done: Set[int]) -> Tuple[List[Tuple[int, List[List[Instruction]]]], int]:
+    """
+    Parse + build instructions for every pending job up front, so a typo
+    on line 90 000 fails before anything is sent.
+    """
+    jobs, bad = [], 0
+    for job_id, job in read_jobs(path):
+        if job_id in done:
+            continue
+        try:
+            jobs.append((job_id, sol.job_txs(job)))
+        except (ValidationError, HTTPException, ValueError) as e:
+            detail = getattr(e, "detail", None) or str(e)
+            print(f"line {job_id}: {job.kind}: {detail}", file=sys.stderr)
+            bad += 1
+    return jobs, bad
+
+
+async def main() -> int:
+    ap = argparse.ArgumentParser(description="Send bulk admin jobs (init-user, deposit, post, ...).")
+    ap.add_argument("jobs", help="jobs file, .jsonl or .csv")
+    ap.add_argument("--progress", help="progress file (default: <jobs>.progress.jsonl)")
+    ap.add_argument("--concurrency", type=int, default=8, help="txs in flight at once")
+    ap.add_argument("--rpc", default=sol.RPC)
+    ap.add_argument("--confirm", action="store_true", help="wait for each tx to confirm")
+    ap.add_argument("--dry-run", action="store_true", help="build + pack only, send nothing")
+    args = ap.parse_args()
+
+    progress_path = args.progress or os.path.splitext(args.jobs)[0] + ".progress.jsonl"
+    done, done_parts, submitted = load_done(progress_path)
+    if submitted and not args.dry_run:
+        print(f"checking {len(submitted)} unconfirmed tx(s) from the last run", flush=True)
+        async with AsyncClient(args.rpc, timeout=30.0) as client:
+            await check_submitted(client, progress_path, submitted, done, done_parts)
+
+    jobs, bad = build(args.jobs, done)
+    if bad:
+        print(f"{bad} invalid job(s), nothing sent", file=sys.stderr)
+        return 2
+
+    batches = pack(jobs, done_parts)
+    print(
+        f"{len(jobs)} jobs to send ({len(done)} already done), "
+        f"packed into {len(batches)} txs",
+        flush=True,
+    )
+    if args.dry_run or not batches:
+        return 0
+
+    async with AsyncClient(args.rpc, timeout=30.0) as client:
+        await sol.fee_payers.refresh_balances(client)
+        await Runner(client, progress_path, args.concurrency, args.confirm).run(batches, len(jobs))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,258 @@
+import asyncio
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import socket
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from tracing import server_span
+
+log = logging.getLogger("solapi.command_bus")
+
+# Shared with Laravel (App\Services\SolCommandBus).
+STREAM = "sol:commands"
+DEAD_STREAM = "sol:commands:dead"
+GROUP = "sol-service"
+RESULT_PREFIX = "sol:cmd_result:"
+
+Handler = Callable[[dict], Awaitable[dict]]
+
+
+def result_key(command_id: str) -> str:
+    return RESULT_PREFIX + command_id
+
+
+# per running command: +1 per tx handed to the RPC, -1 per preflight rejection
+_submitted: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar(
+    "command_submitted", default=None
+)
+
+
+def mark_submitted() -> None:
+    """
+    Call right before handing a tx to the RPC. From then on a failure
+    is ambiguous (the tx may still land), so the command is not retried.
+    No-op outside a command / track_submitted().
+    """
+    flag = _submitted.get()
+    if flag is not None:
+        flag.append(1)
+
+
+def mark_rejected() -> None:
+    """
+    A tx marked with mark_submitted() failed preflight, so it never
+    reached the cluster. The command still isn't retried (the same
+    preflight would fail again), but track_submitted() stops counting it.
+    """
+    flag = _submitted.get()
+    if flag is not None:
+        flag.append(-1)
+
+
+@contextlib.contextmanager
+def track_submitted():
+    """
+    with track_submitted() as submitted:
+        ... submitted() is True while a tx sent in here may still land ...
+
+    Works inside a command (sharing its flag) and outside of one.
+    """
+    flag = _submitted.get()
+    token = None
+    if flag is None:
+        flag = []
+        token = _submitted.set(flag)
+    start = len(flag)
+    try:
+        yield lambda: sum(flag[start:]) > 0
+    finally:
+        if token is not None:
+            _submitted.reset(token)
+
+
+class CommandConsumer:
+    """
+    Consumer-group reader for commands Laravel XADDs to sol:commands.
+
+    Entry fields: id (command id chosen by PHP), command, payload (json),
+    traceparent (optional, continues the PHP trace).
+
+    Every entry ends with a result pushed to sol:cmd_result:<id>
+    (a list, so PHP can BLPOP it) shaped like the HTTP response would
+    have been: {"status": int, "body": {...}}.
+
+    - handler returned           -> status 200, ack
+    - handler raised HTTPException -> that status + detail, ack
+      (it's a client / program error, retrying won't help)
+    - anything else, before any tx was submitted (mark_submitted)
+                                 -> no ack; the entry stays pending and
+      is re-claimed after claim_idle_ms, up to max_attempts deliveries,
+      then it goes to sol:commands:dead with a 500 result.
+    - anything else after a tx was submitted -> straight to the dead
+      stream with a 500: a read timeout after the RPC took the tx looks
+      the same as a failure, and a redelivery would build a new tx
+      (deposit / withdraw twice, a post re-sent under a new seq).
+
+    A result that already exists means an earlier delivery finished
+    (we crashed between send and ack), so the entry is only acked.
+
+    Run as many service processes as you like: they share the group,
+    each entry is delivered to one of them.
+    """
+
+    def __init__(
+        self,
+        redis,
+        handlers: Dict[str, Handler],
+        *,
+        concurrency: int = 16,
+        max_attempts: int = 3,
+        claim_idle_ms: int = 60_000,
+        result_ttl: int = 3600,
+    ):
+        self.redis = redis
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.claim_idle_ms = claim_idle_ms
+        self.result_ttl = result_ttl
+        self.name = f"{socket.gethostname()}-{os.getpid()}"
+        self._sem = asyncio.Semaphore(concurrency)
+        self._tasks: set = set()
+
+    async def _ensure_group(self) -> None:
+        try:
+            await self.redis.xgroup_create(STREAM, GROUP, id="0", mkstream=True)
+        except Exception as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _publish(self, command_id: str, status: int, body) -> None:
+        key = result_key(command_id)
+        await self.redis.rpush(key, json.dumps({"status": status, "body": body}))
+        await self.redis.expire(key, self.result_ttl)
+
+    async def _handle(self, entry_id: str, fields: dict, attempt: int) -> None:
+        command_id = fields.get("id") or entry_id
+        command = fields.get("command", "")
+
+        if await self.redis.exists(result_key(command_id)):
+            await self.redis.xack(STREAM, GROUP, entry_id)
+            return
+
+        handler = self.handlers.get(command)
+        if handler is None:
+            await self._publish(command_id, 400, {"detail": f"unknown_command: {command}"})
+            await self.redis.xack(STREAM, GROUP, entry_id)
+            return
+
+        submitted: List[int] = []
+        token = _submitted.set(submitted)
+        try:
+            payload = json.loads(fields.get("payload") or "{}")
+            # Laravel puts its traceparent on the entry, same as the HTTP header
+            with server_span(f"command {command}", fields.get("traceparent"), attempt=attempt):
+                body = await handler(payload)
+            status = 200
+        except HTTPException as e:
+            status, body = e.status_code, {"detail": e.detail}
+            # init-user reports "sent but not visible yet" as a 202
+            if status < 300 and isinstance(e.detail, dict):
+                body = e.detail
+        except Exception as e:
+            if submitted:
+                log.error("command %s (%s) failed after sending, not retried: %s", command_id, command, e)
+                await self.redis.xadd(
+                    DEAD_STREAM, {**fields, "error": str(e), "submitted": "1"}, maxlen=10_000
+                )
+                status, body = 500, {"detail": f"command_outcome_unknown: {e}"}
+            elif attempt < self.max_attempts:
+                log.warning(
+                    "command %s (%s) attempt %d failed, will retry: %s",
+                    command_id, command, attempt, e,
+                )
+                return
+            else:
+                log.error("command %s (%s) gave up: %s", command_id, command, e)
+                await self.redis.xadd(DEAD_STREAM, {**fields, "error": str(e)}, maxlen=10_000)
+                status, body = 500, {"detail": f"command_failed: {e}"}
+        finally:
+            _submitted.reset(token)
+
+        await self._publish(command_id, status, body)
+        await self.redis.xack(STREAM, GROUP, entry_id)
+
+    def _spawn(self, entry_id: str, fields: dict, attempt: int) -> None:
+        async def run():
+            try:
+                await self._handle(entry_id, fields, attempt)
+            except Exception as e:
+                log.error("command entry %s crashed: %s", entry_id, e)
+            finally:
+                self._sem.release()
+
+        t = asyncio.create_task(run())
+        self._tasks.add(t)
+        t.add_done_callback(self._tasks.discard)
+
+    async def _reclaim(self) -> None:
+        """
+        Take over entries another (or this) consumer left pending.
+        """
+        _next, entries, *_ = await self.redis.xautoclaim(
+            STREAM, GROUP, self.name, self.claim_idle_ms, "0-0", count=self.concurrency
+        )
+        for entry_id, fields in entries:
+            if fields is None:  # trimmed from the stream meanwhile
+                await self.redis.xack(STREAM, GROUP, entry_id)
+                continue
+            info = await self.redis.xpending_range(STREAM, GROUP, entry_id, entry_id, 1)
+            attempt = info[0]["times_delivered"] if info else self.max_attempts
+            await self._sem.acquire()
+            self._spawn(entry_id, fields, attempt)
+
+    async def run(self) -> None:
+        """
+        Background loop, started from the app lifecycle.
+        Blocks on the stream, runs up to `concurrency` commands at once
+        (backpressure: we only read what we can start).
+        """
+        await self._ensure_group()
+        log.info("command consumer %s reading %s", self.name, STREAM)
+        loops = 0
+
+        while True:
+            try:
+                if loops % 10 == 0:
+                    await self._reclaim()
+                loops += 1
+
+                await self._sem.acquire()
+                free = 1
+                while free < self.concurrency and not self._sem.locked():
+                    await self._sem.acquire()
+                    free += 1
+
+                got = 0
+                try:
+                    resp = await self.redis.xreadgroup(
+                        GROUP, self.name, {STREAM: ">"}, count=free, block=5000
+                    )
+                    for _stream, entries in resp or []:
+                        for entry_id, fields in entries:
+                            self._spawn(entry_id, fields, 1)
+                            got += 1
+                finally:
+                    # permits we took but didn't get work for
+                    for _ in range(free - got):
+                        self._sem.release()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("command consumer loop error: %s", e)
+                await asyncio.sleep(1.0)
@@ -0,0 +1,204 @@
+import asyncio
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import httpx
+from solana.rpc.async_api import AsyncClient
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+log = logging.getLogger("solapi.fee_payers")
+
+# leader -> followers: {"<pubkey>": lamports, ..., "_at": unix time}
+BALANCES_KEY = "sol:fee_payer_balances"
+
+
+class FeePayerPool:
+    """
+    A small pool of keypairs that only pay transaction fees.
+
+    The program still needs ADMIN as a signer, but the fee payer is always
+    write-locked by the runtime. Spreading fees over several payers means
+    our txs stop serializing on a single writable account.
+
+    strategy:
+      "least_in_flight" - pick the payer with the fewest pending sends
+                          (ties broken round-robin)
+      "round_robin"     - just rotate
+    """
+
+    def __init__(
+        self,
+        payers: List[Keypair],
+        *,
+        strategy: str = "least_in_flight",
+        low_balance_lamports: int = 0,
+        alert_url: Optional[str] = None,
+    ):
+        if not payers:
+            raise ValueError("fee payer pool needs at least one keypair")
+        if strategy not in ("least_in_flight", "round_robin"):
+            raise ValueError(f"unknown fee payer strategy: {strategy}")
+
+        self.payers = payers
+        self.strategy = strategy
+        self.low_balance_lamports = low_balance_lamports
+        self.alert_url = alert_url
+
+        self._next = 0
+        self._in_flight: Dict[Pubkey, int] = {kp.pubkey(): 0 for kp in payers}
+        self._balances: Dict[Pubkey, Optional[int]] = {
+            kp.pubkey(): None for kp in payers
+        }
+        self._low: Dict[Pubkey, bool] = {kp.pubkey(): False for kp in payers}
+        self._checked_at: Optional[float] = None
+
+    # --------- SELECTION ---------
+    def _usable(self) -> List[Keypair]:
+        """
+        Payers we know are funded. If every payer is below the threshold
+        we still hand them out - the send will fail loudly, which is
+        better than stalling.
+        """
+        ok = [kp for kp in self.payers if not self._low[kp.pubkey()]]
+        return ok or self.payers
+
+    def acquire(self) -> Keypair:
+        """
+        Pick a payer and count it as in-flight.
+        Caller must release() it (or use lease()).
+        """
+        usable = self._usable()
+        start = self._next % len(usable)
+        self._next += 1
+        rotated = usable[start:] + usable[:start]
+
+        if self.strategy == "round_robin":
+            kp = rotated[0]
+        else:
+            kp = min(rotated, key=lambda k: self._in_flight[k.pubkey()])
+
+        self._in_flight[kp.pubkey()] += 1
+        return kp
+
+    def release(self, kp: Keypair) -> None:
+        pk = kp.pubkey()
+        if self._in_flight.get(pk, 0) > 0:
+            self._in_flight[pk] -= 1
+
+    @asynccontextmanager
+    async def lease(self):
+        kp = self.acquire()
+        try:
+            yield kp
+        finally:
+            self.release(kp)
+
+    # --------- BALANCES ---------
+    async def refresh_balances(self, client: AsyncClient) -> None:
+        """
+        Fetch every payer balance and raise an alert for the ones that
+        dropped under low_balance_lamports.
+        """
+        for kp in self.payers:
+            pk = kp.pubkey()
+            try:
+                r = await client.get_balance(pk)
+            except Exception as e:
+                log.warning("fee payer %s balance check failed: %s", pk, e)
+                continue
+
+            lamports = r.value
+            self._balances[pk] = lamports
+
+            was_low = self._low[pk]
+            is_low = lamports < self.low_balance_lamports
+            self._low[pk] = is_low
+
+            # only alert on the transition, not on every poll
+            if is_low and not was_low:
+                await self._alert(pk, lamports)
+
+        self._checked_at = time.time()
+
+    async def _alert(self, pk: Pubkey, lamports: int) -> None:
+        log.warning(
+            "fee payer %s low balance: %d lamports (threshold %d), top it up",
+            pk,
+            lamports,
+            self.low_balance_lamports,
+        )
+        if not self.alert_url:
+            return
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as http:
+                await http.post(
+                    self.alert_url,
+                    json={
+                        "event": "fee_payer_low_balance",
+                        "pubkey": str(pk),
+                        "lamports": lamports,
+                        "threshold_lamports": self.low_balance_lamports,
+                    },
+                )
+        except Exception as e:
+            log.warning("fee payer alert webhook failed: %s", e)
+
+    async def _publish_balances(self, redis) -> None:
+        body = {str(pk): v for pk, v in self._balances.items() if v is not None}
+        await redis.set(BALANCES_KEY, json.dumps({**body, "_at": self._checked_at}))
+
+    async def _load_balances(self, redis) -> None:
+        """
+        Follower side: take the leader's numbers, no RPC and no alerts
+        (the leader already sent them).
+        """
+        raw = await redis.get(BALANCES_KEY)
+        if not raw:
+            return
+        shared = json.loads(raw)
+        for pk in self._balances:
+            lamports = shared.get(str(pk))
+            if lamports is not None:
+                self._balances[pk] = lamports
+                self._low[pk] = lamports < self.low_balance_lamports
+        self._checked_at = shared.get("_at")
+
+    async def monitor(self, client: AsyncClient, interval: float, leader=None) -> None:
+        """
+        Background loop, started from the app lifecycle.
+        With several workers (leader = shared_state.LeaderLease) only
+        the leader polls the RPC; the others read what it published.
+        """
+        while True:
+            try:
+                if leader is None or leader.redis is None:
+                    await self.refresh_balances(client)
+                elif leader.is_leader:
+                    await self.refresh_balances(client)
+                    await self._publish_balances(leader.redis)
+                else:
+                    await self._load_balances(leader.redis)
+            except Exception as e:
+                log.warning("fee payer monitor: %s", e)
+            await asyncio.sleep(interval)
+
+    # --------- INTROSPECTION ---------
+    def status(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "low_balance_lamports": self.low_balance_lamports,
+            "checked_at": self._checked_at,
+            "payers": [
+                {
+                    "pubkey": str(kp.pubkey()),
+                    "in_flight": self._in_flight[kp.pubkey()],
+                    "lamports": self._balances[kp.pubkey()],
+                    "low": self._low[kp.pubkey()],
+                }
+                for kp in self.payers
+            ],
+        }
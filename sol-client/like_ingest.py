@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from solders.pubkey import Pubkey
+
+from shared_state import RELEASE_LUA
+
+log = logging.getLogger("solapi.like_ingest")
+
+# Shared with Laravel (likes:flush in routes/console.php).
+LIKED_PREFIX = "sol:liked:"      # sol:liked:<owner>:<seq>:<liker> -> sig (or "pending")
+COUNTS_KEY = "sol:like_counts"   # hash "<owner>:<seq>" -> pending increment
+
+LikeKey = Tuple[Pubkey, int, Pubkey]
+
+# getSignatureStatuses limit
+MAX_SIG_STATUSES = 256
+
+
+class LikeIngest:
+    """
+    Front stage for /like.
+
+    - a like we've already sent (memory LRU, then Redis SET NX) is not
+      sent again: the caller gets the original sig and duplicate=True
+    - identical likes arriving while the first is in flight wait for it
+      instead of sending their own tx; if the first is in flight in
+      another process the caller gets sig None (pending)
+    - a sent like holds its key for submit_ttl only; one background
+      loop checks every unconfirmed sig (one getSignatureStatuses per
+      256) and keeps the key for liked_ttl once the tx is confirmed, or
+      drops it if the tx failed / never landed, so the like can be sent
+      again
+    - each confirmed like adds +1 to a Redis hash; Laravel's likes:flush
+      job turns the hash into one batched UPDATE of posts.likes_count
+
+    Works without Redis too (memory dedupe only, no counters).
+    """
+
+    def __init__(
+        self,
+        redis,
+        send_like: Callable[[Pubkey, int, Pubkey], Awaitable[str]],
+        sig_statuses: Callable[[List[str]], Awaitable[List[Optional[bool]]]],
+        *,
+        seen_max: int = 100_000,
+        liked_ttl: int = 30 * 86400,
+        pending_ttl: int = 60,
+        submit_ttl: int = 120,
+        confirm_every: float = 1.0,
+    ):
+        self.redis = redis
+        self._send_like = send_like
+        # sig_statuses(sigs) -> per sig: True confirmed, False failed, None not yet
+        self._sig_statuses = sig_statuses
+        self.seen_max = seen_max
+        self.liked_ttl = liked_ttl
+        # a claim whose process died before sending frees up after this
+        self.pending_ttl = pending_ttl
+        # a sent like not confirmed by then was dropped (blockhash expired)
+        self.submit_ttl = submit_ttl
+        self.confirm_every = confirm_every
+        self._seen: "OrderedDict[LikeKey, str]" = OrderedDict()
+        self._inflight: Dict[LikeKey, asyncio.Future] = {}
+        self._unconfirmed: Dict[str, Tuple[LikeKey, float]] = {}  # sig -> (like, sent at)
+        self._confirmer: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _redis_key(k: LikeKey) -> str:
+        owner, seq, liker = k
+        return f"{LIKED_PREFIX}{owner}:{seq}:{liker}"
+
+    def _remember(self, k: LikeKey, sig: str) -> None:
+        self._seen[k] = sig
+        self._seen.move_to_end(k)
+        while len(self._seen) > self.seen_max:
+            self._seen.popitem(last=False)
+
+    async def like(self, post_owner: Pubkey, post_seq: int, liker: Pubkey) -> Tuple[Optional[str], bool]:
+        """
+        Returns (sig, duplicate). sig is None while another process is
+        still sending the same like.
+        """
+        k: LikeKey = (post_owner, post_seq, liker)
+
+        if k in self._seen:
+            return self._seen[k], True
+
+        pending = self._inflight.get(k)
+        if pending is not None:
+            return await asyncio.shield(pending), True
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[k] = fut
+        try:
+            sig, duplicate = await self._like_once(k)
+            fut.set_result(sig)
+            return sig, duplicate
+        except Exception as e:
+            fut.set_exception(e)
+            # nobody else may be waiting; don't leave "never retrieved" noise
+            fut.exception()
+            raise
+        except BaseException:
+            fut.cancel()
+            raise
+        finally:
+            self._inflight.pop(k, None)
+
+    async def _like_once(self, k: LikeKey) -> Tuple[Optional[str], bool]:
+        rkey = self._redis_key(k)
+
+        if self.redis is not None:
+            # claim the like across processes before paying for the tx
+            claimed = await self.redis.set(rkey, "pending", nx=True, ex=self.pending_ttl)
+            if not claimed:
+                sig = await self.redis.get(rkey)
+                if not sig or sig == "pending":
+                    # another process is sending it right now
+                    return None, True
+                self._remember(k, sig)
+                return sig, True
+
+        try:
+            sig = await self._send_like(*k)
+        except BaseException:
+            if self.redis is not None:
+                await self.redis.delete(rkey)
+            raise
+
+        self._remember(k, sig)
+
+        if self.redis is not None:
+            try:
+                await self.redis.set(rkey, sig, ex=self.submit_ttl)
+            except Exception as e:
+                log.warning("like bookkeeping for %s failed: %s", rkey, e)
+
+        self._unconfirmed[sig] = (k, time.time())
+        if self._confirmer is None or self._confirmer.done():
+            self._confirmer = asyncio.create_task(self._confirm_loop())
+
+        return sig, False
+
+    # --------- CONFIRMATION ---------
+    async def _confirm_loop(self) -> None:
+        while self._unconfirmed:
+            await asyncio.sleep(self.confirm_every)
+            sigs = list(self._unconfirmed)
+            for i in range(0, len(sigs), MAX_SIG_STATUSES):
+                batch = sigs[i : i + MAX_SIG_STATUSES]
+                try:
+                    statuses = await self._sig_statuses(batch)
+                except Exception as e:
+                    log.warning("like sig statuses failed: %s", e)
+                    continue
+                now = time.time()
+                for sig, ok in zip(batch, statuses):
+                    k, sent_at = self._unconfirmed[sig]
+                    if ok is None and now - sent_at < self.submit_ttl:
+                        continue
+                    del self._unconfirmed[sig]
+                    try:
+                        if ok:
+                            await self._confirmed(k, sig)
+                        else:
+                            await self._dropped(k, sig)
+                    except Exception as e:
+                        log.warning("like bookkeeping for %s failed: %s", sig, e)
+
+    async def _confirmed(self, k: LikeKey, sig: str) -> None:
+        if self.redis is None:
+            return
+        owner, seq, _liker = k
+        await self.redis.set(self._redis_key(k), sig, ex=self.liked_ttl)
+        await self.redis.hincrby(COUNTS_KEY, f"{owner}:{seq}", 1)
+
+    async def _dropped(self, k: LikeKey, sig: str) -> None:
+        log.warning("like tx %s failed or never landed, like can be sent again", sig)
+        if self._seen.get(k) == sig:
+            del self._seen[k]
+        if self.redis is not None:
+            # only if it's still ours (not a later re-send's)
+            await self.redis.eval(RELEASE_LUA, 1, self._redis_key(k), sig)
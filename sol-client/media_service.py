@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from PIL import Image, ImageOps, features
+
+# Runs next to sol_service:
+#   uvicorn media_service:app --port 8002
+#
+# Takes an uploaded image, dedupes it by content hash and writes resized,
+# metadata-free variants into Laravel's public disk:
+#
+#   <MEDIA_ROOT>/<sha256>/<width>.webp   (+ <width>.avif when supported)
+#   <MEDIA_ROOT>/<sha256>/manifest.json
+#
+# Animated images are kept as-is (<sha256>/orig.<ext>).
+# Paths in responses are relative to Laravel's public disk root.
+
+# --------- CONFIG ---------
+MEDIA_ROOT = os.environ.get(
+    "MEDIA_ROOT",
+    os.path.join(os.path.dirname(__file__), "..", "infra", "storage", "app", "public", "post_media", "v"),
+)
+# MEDIA_ROOT relative to the public disk, for building paths
+MEDIA_DISK_PREFIX = os.environ.get("MEDIA_DISK_PREFIX", "post_media/v")
+
+# keep in sync with MEDIA_WIDTHS in resources/js/components/PostCard.tsx
+WIDTHS = (320, 640, 1280)
+MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+MAX_PIXELS = 40_000_000
+WEBP_QUALITY = 80
+AVIF_QUALITY = 55
+MEDIA_WORKERS = int(os.environ.get("MEDIA_WORKERS", str(os.cpu_count() or 2)))
+
+Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+
+# --------- APP ---------
+app = FastAPI()
+pool: Optional[ProcessPoolExecutor] = None
+# hash -> in-progress render, so identical concurrent uploads render once
+inflight: Dict[str, asyncio.Future] = {}
+
+
+# --------- RENDERING (runs in worker processes) ---------
+def variant_widths(orig_w: int) -> List[int]:
+    """
+    Every standard width below the original + the original capped at
+    the largest standard width. PostCard rebuilds the same list from
+    the width in the src URL.
+    """
+    top = min(orig_w, WIDTHS[-1])
+    return [w for w in WIDTHS if w < top] + [top]
+
+
+def render_variants(data: bytes, out_dir: str, digest: str) -> dict:
+    """
+    Decode, orient, strip metadata and write every variant into a temp
+    dir that is renamed into place at the end, so readers never see a
+    half-written set.
+    """
+    import io
+
+    img = Image.open(io.BytesIO(data))
+    fmt = (img.format or "").lower()
+    animated = getattr(img, "is_animated", False)
+
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(out_dir))
+    try:
+        variants = []
+        if animated:
+            # resizing every frame isn't worth it for GIF pickers' output
+            name = f"orig.{fmt or 'gif'}"
+            with open(os.path.join(tmp, name), "wb") as f:
+                f.write(data)
+            src = name
+            width, height = img.size
+        else:
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ("RGB", "RGBA"):
+                has_alpha = "transparency" in img.info or img.mode in ("LA", "PA")
+                img = img.convert("RGBA" if has_alpha else "RGB")
+            img.info = {}  # drop EXIF / XMP / ICC / comments
+            width, height = img.size
+
+            for w in variant_widths(width):
+                h = max(1, round(height * w / width))
+                resized = img if w == width else img.resize((w, h), Image.LANCZOS)
+
+                resized.save(os.path.join(tmp, f"{w}.webp"), "WEBP", quality=WEBP_QUALITY, method=4)
+                variants.append({"file": f"{w}.webp", "width": w, "format": "webp"})
+
+                if features.check("avif"):
+                    resized.save(os.path.join(tmp, f"{w}.avif"), "AVIF", quality=AVIF_QUALITY)
+                    variants.append({"file": f"{w}.avif", "width": w, "format": "avif"})
+
+            src = f"{variant_widths(width)[-1]}.webp"
+
+        manifest = {
+            "hash": digest,
+            "width": width,
+            "height": height,
+            "animated": bool(animated),
+            "src": src,
+            "variants": variants,
+        }
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+
+        try:
+            os.rename(tmp, out_dir)
+        except OSError:
+            # another process finished the same hash first, keep theirs
+            shutil.rmtree(tmp, ignore_errors=True)
+        return manifest
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+# --------- UTILS ---------
+def read_manifest(out_dir: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(out_dir, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def with_paths(manifest: dict) -> dict:
+    """
+    Turn file names into public-disk paths for Laravel.
+    """
+    base = f"{MEDIA_DISK_PREFIX}/{manifest['hash']}"
+    return {
+        "hash": manifest["hash"],
+        "width": manifest["width"],
+        "height": manifest["height"],
+        "animated": manifest["animated"],
+        "src_path": f"{base}/{manifest['src']}",
+        "variants": [
+            {"path": f"{base}/{v['file']}", "width": v["width"], "format": v["format"]}
+            for v in manifest["variants"]
+        ],
+    }
+
+
+# --------- LIFECYCLE ---------
+@app.on_event("startup")
+async def startup():
+    global pool
+    os.makedirs(MEDIA_ROOT, exist_ok=True)
+    pool = ProcessPoolExecutor(max_workers=MEDIA_WORKERS)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    pool.shutdown(cancel_futures=True)
+
+
+# --------- ENDPOINTS ---------
+@app.get("/")
+async def root():
+    return {
+        "ok": True,
+        "service": "media",
+        "avif": features.check("avif"),
+        "endpoints": ["/media"],
+    }
+
+
+@app.post("/media")
+async def upload(file: UploadFile = File(...)):
+    """
+    Store one image. Same bytes -> same hash -> no new work,
+    the existing variants are returned.
+    """
+    data = await file.read(MAX_UPLOAD_BYTES + 1)
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise HTTPException(413, "file_too_large")
+    if not data:
+        raise HTTPException(400, "empty_file")
+
+    digest = hashlib.sha256(data).hexdigest()
+    out_dir = os.path.join(MEDIA_ROOT, digest)
+
+    manifest = read_manifest(out_dir)
+    if manifest is not None:
+        return {"ok": True, "deduped": True, **with_paths(manifest)}
+
+    fut = inflight.get(digest)
+    if fut is None:
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(pool, render_variants, data, out_dir, digest)
+        inflight[digest] = fut
+        fut.add_done_callback(lambda _f: inflight.pop(digest, None))
+        deduped = False
+    else:
+        deduped = True
+
+    try:
+        manifest = await asyncio.shield(fut)
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError) as e:
+        raise HTTPException(400, f"bad_image: {e}")
+
+    # a concurrent process may have won the rename, read what's on disk
+    manifest = read_manifest(out_dir) or manifest
+    return {"ok": True, "deduped": deduped, **with_paths(manifest)}
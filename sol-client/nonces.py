@@ -0,0 +1,374 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from solana.rpc.async_api import AsyncClient
+from solders.hash import Hash
+from solders.instruction import Instruction
+from solders.pubkey import Pubkey
+from solders.system_program import (
+    AdvanceNonceAccountParams,
+    advance_nonce_account,
+    create_nonce_account_with_seed,
+)
+
+log = logging.getLogger("solapi.nonces")
+
+SYS = Pubkey.from_string("11111111111111111111111111111111")
+
+# Nonce account size (state::Versions):
+# [0..4)   version u32
+# [4..8)   state u32 (1 = initialized)
+# [8..40)  authority
+# [40..72) durable nonce (used as the tx "blockhash")
+# [72..80) lamports_per_signature u64
+NONCE_ACCOUNT_LEN = 80
+
+# Leases shared by every worker when the pool has Redis:
+# hash pubkey -> {nonce, label, leased_at} / {nonce, at}
+IN_USE_KEY = "sol:nonce:in_use"
+SPENT_KEY = "sol:nonce:spent"
+
+@dataclass
+class NonceLease:
+    pubkey: Pubkey
+    nonce: Hash
+    label: str
+
+    def advance_ix(self, authority: Pubkey) -> Instruction:
+        """
+        Must be the FIRST instruction of the tx, otherwise the runtime
+        treats the nonce as a plain (expired) blockhash.
+        """
+        return advance_nonce_account(
+            AdvanceNonceAccountParams(
+                nonce_pubkey=self.pubkey,
+                authorized_pubkey=authority,
+            )
+        )
+
+
+def parse_nonce_account(raw: bytes) -> Optional[Hash]:
+    """
+    Return the stored durable nonce, or None if the account
+    isn't an initialized nonce account.
+    """
+    if len(raw) < NONCE_ACCOUNT_LEN:
+        return None
+    state = int.from_bytes(raw[4:8], "little")
+    if state != 1:
+        return None
+    return Hash.from_bytes(raw[40:72])
+
+
+class NoncePool:
+    """
+    Durable nonce accounts owned (authority) by ADMIN.
+
+    Addresses are derived with create_with_seed(ADMIN, "nonce-<i>"),
+    so we never have to store extra keypairs, and the same pool comes
+    back after a restart.
+
+    A nonce account can back exactly one outstanding tx: once a tx
+    signed against it is on-chain the nonce advances and every other
+    tx signed with the old value is dead. So every lease is tracked
+    until release(). With redis set (several workers) leases live in
+    IN_USE_KEY / SPENT_KEY and are claimed with HSETNX, so two workers
+    never lease the same account; otherwise they are kept in memory and
+    written to state_path so pre-signed work that is still queued
+    survives restarts.
+
+    A sent tx only advances the nonce once it lands, so release(sent=True)
+    remembers the value it was signed with and acquire() skips the
+    account until the chain shows a different one. A durable nonce tx
+    never expires, so a dropped one holds its account until a plain
+    release() (sent=False) gives it up.
+    """
+
+    def __init__(
+        self,
+        authority: Pubkey,
+        size: int,
+        state_path: Optional[str] = None,
+        redis=None,
+    ):
+        self.authority = authority
+        self.size = size
+        self.state_path = state_path
+        self.redis = redis
+
+        self.accounts: List[Pubkey] = []
+        self._order: deque = deque()  # acquire() starts at the front
+        self._in_use: Dict[Pubkey, dict] = {}
+        self._spent: Dict[Pubkey, dict] = {}  # released after a send: {nonce, at}
+
+    @staticmethod
+    def seed_for(i: int) -> str:
+        return f"nonce-{i}"
+
+    def address_for(self, i: int) -> Pubkey:
+        return Pubkey.create_with_seed(self.authority, self.seed_for(i), SYS)
+
+    # --------- STATE FILE ---------
+    def _load_state(self) -> dict:
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("nonce state %s unreadable: %s", self.state_path, e)
+            return {}
+
+    def _save_state(self) -> None:
+        if not self.state_path or self.redis is not None:
+            return
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(
+                {
+                    "in_use": {str(pk): v for pk, v in self._in_use.items()},
+                    "spent": {str(pk): v for pk, v in self._spent.items()},
+                },
+                f,
+            )
+        os.replace(tmp, self.state_path)
+
+    # --------- LEASE STORE ---------
+    async def _claim(self, pks: List[Pubkey], lease: dict) -> List[Pubkey]:
+        """
+        Mark pks in use unless someone else holds them; returns the ones we got.
+        """
+        if self.redis is None:
+            got = [pk for pk in pks if pk not in self._in_use]
+            for pk in got:
+                self._in_use[pk] = dict(lease)
+            return got
+        pipe = self.redis.pipeline(transaction=False)
+        for pk in pks:
+            pipe.hsetnx(IN_USE_KEY, str(pk), json.dumps(lease))
+        return [pk for pk, ok in zip(pks, await pipe.execute()) if ok]
+
+    async def _unclaim(self, pks: List[Pubkey]) -> None:
+        if not pks:
+            return
+        if self.redis is None:
+            for pk in pks:
+                self._in_use.pop(pk, None)
+            return
+        await self.redis.hdel(IN_USE_KEY, *map(str, pks))
+
+    async def _set_leases(self, leases: Dict[Pubkey, dict]) -> None:
+        if self.redis is None:
+            self._in_use.update(leases)
+            return
+        await self.redis.hset(
+            IN_USE_KEY, mapping={str(pk): json.dumps(v) for pk, v in leases.items()}
+        )
+
+    async def _spent_of(self, pks: List[Pubkey]) -> Dict[Pubkey, dict]:
+        if self.redis is None:
+            return {pk: self._spent[pk] for pk in pks if pk in self._spent}
+        raw = await self.redis.hmget(SPENT_KEY, [str(pk) for pk in pks])
+        return {pk: json.loads(v) for pk, v in zip(pks, raw) if v}
+
+    async def _drop_spent(self, pks: List[Pubkey]) -> None:
+        if not pks:
+            return
+        if self.redis is None:
+            for pk in pks:
+                self._spent.pop(pk, None)
+            return
+        await self.redis.hdel(SPENT_KEY, *map(str, pks))
+
+    async def _leased(self) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+        """(in_use, spent) keyed by pubkey string, for status()."""
+        if self.redis is None:
+            return (
+                {str(pk): v for pk, v in self._in_use.items()},
+                {str(pk): v for pk, v in self._spent.items()},
+            )
+        in_use, spent = await asyncio.gather(
+            self.redis.hgetall(IN_USE_KEY), self.redis.hgetall(SPENT_KEY)
+        )
+        return (
+            {pk: json.loads(v) for pk, v in in_use.items()},
+            {pk: json.loads(v) for pk, v in spent.items()},
+        )
+
+    # --------- DISCOVERY / CREATION ---------
+    async def load(self, client: AsyncClient) -> None:
+        """
+        Find which of the derived nonce accounts exist on-chain, and
+        without Redis restore the leases from state_path.
+        """
+        wanted = [self.address_for(i) for i in range(self.size)]
+        existing: List[Pubkey] = []
+        for i in range(0, len(wanted), 100):
+            batch = wanted[i : i + 100]
+            r = await client.get_multiple_accounts(batch, encoding="base64")
+            for pk, acc in zip(batch, r.value):
+                if acc is not None:
+                    existing.append(pk)
+
+        self.accounts = existing
+        self._order = deque(existing)
+        if self.redis is None:
+            state = self._load_state()
+            leased, spent = state.get("in_use", {}), state.get("spent", {})
+            self._in_use = {
+                pk: leased[str(pk)] for pk in existing if str(pk) in leased
+            }
+            self._spent = {
+                pk: spent[str(pk)] for pk in existing if str(pk) in spent
+            }
+        in_use, _spent = await self._leased()
+        log.info(
+            "nonce pool: %d accounts, %d leased",
+            len(self.accounts),
+            len(in_use),
+        )
+
+    async def ensure(
+        self,
+        client: AsyncClient,
+        count: int,
+        send: Callable[[List[Instruction]], Awaitable[str]],
+    ) -> List[str]:
+        """
+        Create missing nonce accounts so the pool has `count` of them.
+        ADMIN funds the rent and is the authority. Returns tx sigs.
+        Other workers pick the new accounts up on their next load().
+        """
+        count = min(count, self.size)
+        have = set(self.accounts)
+        rent = (
+            await client.get_minimum_balance_for_rent_exemption(NONCE_ACCOUNT_LEN)
+        ).value
+
+        sigs = []
+        for i in range(count):
+            pk = self.address_for(i)
+            if pk in have:
+                continue
+            create_ix, init_ix = create_nonce_account_with_seed(
+                self.authority,
+                pk,
+                self.authority,
+                self.seed_for(i),
+                self.authority,
+                rent,
+            )
+            sigs.append(await send([create_ix, init_ix]))
+            self.accounts.append(pk)
+            self._order.append(pk)
+        return sigs
+
+    # --------- LEASING ---------
+    async def acquire(self, client: AsyncClient, n: int, label: str) -> List[NonceLease]:
+        """
+        Lease n free nonce accounts and read their current nonce values
+        (one getMultipleAccounts per 100). Accounts whose last tx hasn't
+        landed yet are skipped. Raises LookupError if the pool doesn't
+        have enough usable accounts.
+        """
+        if self.redis is not None and len(self.accounts) < self.size:
+            # /nonce/ensure may have run on another worker
+            await self.load(client)
+
+        now = time.time()
+        todo = list(self._order)
+        leases: List[NonceLease] = []
+        waiting: List[Pubkey] = []  # claimed, but the chain still has the spent nonce
+        advanced: List[Pubkey] = []  # spent marker is stale
+        claimed: List[Pubkey] = []
+        try:
+            while len(leases) < n and todo:
+                want = min(n - len(leases), 100)
+                batch, todo = todo[:want], todo[want:]
+                batch = await self._claim(batch, {"label": label, "leased_at": now})
+                if not batch:
+                    continue
+                claimed += batch
+                r = await client.get_multiple_accounts(batch, encoding="base64")
+                spent = await self._spent_of(batch)
+                for pk, acc in zip(batch, r.value):
+                    data = acc.data if acc is not None else b""
+                    if isinstance(data, tuple):
+                        data = base64.b64decode(data[0])
+                    nonce = parse_nonce_account(bytes(data))
+                    if nonce is None:
+                        raise LookupError(f"{pk} is not an initialized nonce account")
+                    if pk in spent and spent[pk]["nonce"] == str(nonce):
+                        waiting.append(pk)
+                        continue
+                    if pk in spent:
+                        advanced.append(pk)
+                    leases.append(NonceLease(pk, nonce, label))
+            if len(leases) < n:
+                raise LookupError(
+                    f"nonce pool exhausted: want {n}, ready {len(leases)}, "
+                    f"{len(waiting)} waiting for their last tx to land"
+                )
+        except Exception:
+            await self._unclaim(claimed)
+            self._save_state()
+            raise
+
+        await self._unclaim(waiting)
+        await self._drop_spent(advanced)
+        await self._set_leases(
+            {
+                lease.pubkey: {"nonce": str(lease.nonce), "label": label, "leased_at": now}
+                for lease in leases
+            }
+        )
+        self._save_state()
+
+        # what we looked at goes to the back, so the next call starts elsewhere
+        self._order.rotate(-(len(self._order) - len(todo)))
+        return leases
+
+    async def release(self, pubkey: Pubkey, sent: bool = False) -> None:
+        """
+        Give the account back: after its tx was sent (sent=True, usable
+        again once the nonce advanced) or when the pre-signed tx was
+        thrown away / rejected.
+
+        sent=False on an account that is only waiting for its sent tx
+        to land makes it usable right away; that tx may still land.
+        """
+        if self.redis is None:
+            lease = self._in_use.pop(pubkey, None)
+        else:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.hget(IN_USE_KEY, str(pubkey))
+            pipe.hdel(IN_USE_KEY, str(pubkey))
+            raw, _n = await pipe.execute()
+            lease = json.loads(raw) if raw else None
+
+        if sent and lease is not None and lease.get("nonce"):
+            spent = {"nonce": lease["nonce"], "at": time.time()}
+            if self.redis is None:
+                self._spent[pubkey] = spent
+            else:
+                await self.redis.hset(SPENT_KEY, str(pubkey), json.dumps(spent))
+        elif not sent:
+            await self._drop_spent([pubkey])
+        self._save_state()
+
+    async def status(self) -> dict:
+        in_use, spent = await self._leased()
+        return {
+            "size": self.size,
+            "accounts": len(self.accounts),
+            "free": sum(1 for pk in self.accounts if str(pk) not in in_use),
+            "in_use": in_use,
+            "spent": spent,
+        }
@@ -0,0 +1,104 @@
+import zlib
+from typing import Tuple
+
+# Post payload envelope.
+#
+# The Memo content is opaque to the program, so we are free to store
+# compressed bytes. A compressed post starts with:
+#
+#   MAGIC[4] | version u8 | codec u8 | body...
+#
+# Anything that doesn't start with MAGIC is a plain UTF-8 post
+# (every post written before the envelope existed), so old posts stay
+# readable. MAGIC begins with NUL, which never starts normal text.
+MAGIC = b"\x00F4Z"
+VERSION = 1
+
+CODEC_DEFLATE = 1       # raw deflate
+CODEC_DEFLATE_DICT1 = 2  # raw deflate with POST_DICT_V1 preset dictionary
+
+# Preset dictionary for short social text. deflate looks back at most
+# 32 KB, the most useful strings go LAST (closest to the data).
+# Never edit in place: old posts need the exact bytes to decode.
+# Add POST_DICT_V2 + a new codec id instead.
+POST_DICT_V1 = (
+    b"the and that this with for you have are not but what was just "
+    b"about from they will would there their your been when more like "
+    b"some time people know think really good today thanks thank you "
+    b"love new great going make want need right now here how why who "
+    b"lol lmao omg wtf imo tbh idk btw fyi gm gn wagmi ngmi lfg fren "
+    b"crypto wallet token airdrop mint nft devnet mainnet blockchain "
+    b"validator staking defi dao memecoin pump dump moon bullish bearish "
+    b"solana sol Solana SOL Phantom "
+    b"https://x.com/ https://twitter.com/ https://www.youtube.com/watch?v= "
+    b"https://media.tenor.com/ https://c.tenor.com/ .gif .png .jpg .webp "
+    b"/storage/post_media/ https://"
+)
+
+_DICTS = {
+    CODEC_DEFLATE: b"",
+    CODEC_DEFLATE_DICT1: POST_DICT_V1,
+}
+
+
+def _deflate(raw: bytes, zdict: bytes) -> bytes:
+    if zdict:
+        c = zlib.compressobj(9, zlib.DEFLATED, -15, 9, zdict=zdict)
+    else:
+        c = zlib.compressobj(9, zlib.DEFLATED, -15, 9)
+    return c.compress(raw) + c.flush()
+
+
+def _inflate(body: bytes, zdict: bytes) -> bytes:
+    if zdict:
+        d = zlib.decompressobj(-15, zdict=zdict)
+    else:
+        d = zlib.decompressobj(-15)
+    out = d.decompress(body) + d.flush()
+    # raw inflate of a cut-off stream doesn't raise, it just stops early
+    if not d.eof:
+        raise zlib.error("incomplete deflate stream")
+    return out
+
+
+def encode_post(text: str) -> Tuple[bytes, str]:
+    """
+    Bytes to put on-chain for `text` + the codec name used.
+    Picks the smallest of plain / deflate / deflate+dict; plain wins
+    ties so short posts stay human-readable in explorers.
+    """
+    raw = text.encode("utf-8")
+    best, name = raw, "plain"
+
+    for codec, label in (
+        (CODEC_DEFLATE_DICT1, "deflate-dict1"),
+        (CODEC_DEFLATE, "deflate"),
+    ):
+        packed = MAGIC + bytes([VERSION, codec]) + _deflate(raw, _DICTS[codec])
+        if len(packed) < len(best):
+            best, name = packed, label
+
+    return best, name
+
+
+def decode_post(content: bytes) -> bytes:
+    """
+    Reassembled chunk bytes -> original UTF-8 bytes.
+    Plain payloads are returned as-is. Raises ValueError on an
+    envelope we can't decode, including one missing its tail
+    (a chunk that wasn't read).
+    """
+    if not content.startswith(MAGIC):
+        return content
+
+    header = content[len(MAGIC) : len(MAGIC) + 2]
+    if len(header) < 2:
+        raise ValueError("truncated post envelope")
+    version, codec = header[0], header[1]
+    if version != VERSION or codec not in _DICTS:
+        raise ValueError(f"unknown post envelope v{version} codec {codec}")
+
+    try:
+        return _inflate(content[len(MAGIC) + 2 :], _DICTS[codec])
+    except zlib.error as e:
+        raise ValueError(f"corrupt post envelope: {e}")
@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import secrets
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from solders.pubkey import Pubkey
+
+from command_bus import track_submitted
+from shared_state import RELEASE_LUA, RENEW_LUA
+
+log = logging.getLogger("solapi.sequencer")
+
+LOCK_PREFIX = "sol:owner_lock:"  # sol:owner_lock:<owner> -> holder token
+SEQ_PREFIX = "sol:seq:"          # sol:seq:<owner> -> "<last seq>:<unix time it was set>"
+
+# a tx that hasn't landed this long after it was sent never will
+# (its blockhash expired), so a lower chain count is the truth by then
+SETTLE_SECS = 60.0
+
+# KEYS: seq key, owner lock key
+# ARGV: chain count, now, settle secs, fresh (1/0), ttl
+# higher -> take it; equal + fresh -> confirm it (resets the clock);
+# lower + fresh -> take it once nothing is in flight and it settled
+OBSERVE_LUA = """
+local seen = tonumber(ARGV[1])
+local cur = redis.call('get', KEYS[1])
+if cur then
+    local sep = string.find(cur, ':', 1, true)
+    local last, at = tonumber(cur), 0
+    if sep then
+        last = tonumber(string.sub(cur, 1, sep - 1))
+        at = tonumber(string.sub(cur, sep + 1))
+    end
+    if seen < last then
+        if ARGV[4] ~= '1' or redis.call('exists', KEYS[2]) == 1
+            or tonumber(ARGV[2]) - at < tonumber(ARGV[3]) then
+            return 0
+        end
+    elseif seen == last and ARGV[4] ~= '1' then
+        return 0
+    end
+elseif ARGV[4] ~= '1' then
+    return 0
+end
+redis.call('set', KEYS[1], ARGV[1] .. ':' .. ARGV[2], 'EX', ARGV[5])
+return 1
+"""
+
+
+class OwnerSequencer:
+    """
+    In-memory owner -> last known post seq.
+
+    The program bumps posts_created once per post, so the seq of the
+    next post is last + 1. The chain lags behind what we've just sent,
+    so within settle_secs of the last send (or chain check) we count
+    locally; after that the next post reads the counter from the chain
+    again. That also picks up a sent tx that never landed and posts
+    made outside the sequencer (bulk.py, /nonce/submit).
+
+    Each owner has its own lock: posts by the same owner go out one
+    after the other (so two concurrent posts can't get the same seq),
+    while different owners run in parallel.
+
+    If a post fails before any of its txs went out (or they were all
+    rejected in preflight) we forget the owner, and the next post reads
+    the chain again. If one did go out (the head chunk may land) the
+    seq stays taken for settle_secs, like a successful send: a read
+    right away could still miss it.
+
+    load(owner) must read at 'confirmed' or better, never from a cache.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[Pubkey], Awaitable[Optional[int]]],
+        *,
+        settle_secs: float = SETTLE_SECS,
+    ):
+        # load(owner) -> posts_created on-chain, or None if no user PDA
+        self._load = load
+        self.settle_secs = settle_secs
+        self._last: Dict[Pubkey, Tuple[int, float]] = {}  # owner -> (seq, set at)
+        self._locks: Dict[Pubkey, asyncio.Lock] = {}
+
+    def _lock_for(self, owner: Pubkey) -> asyncio.Lock:
+        lock = self._locks.get(owner)
+        if lock is None:
+            lock = self._locks[owner] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def next(self, owner: Pubkey):
+        """
+        async with sequencer.next(owner) as seq:
+            ... send the post txs ...
+
+        Yields None if the owner has no user PDA.
+        The seq is committed if the block exits cleanly, or if it
+        raised after a tx went out (mark_submitted, not mark_rejected).
+        """
+        async with self._lock_for(owner):
+            entry = self._last.get(owner)
+            if entry is not None and time.time() - entry[1] < self.settle_secs:
+                last = entry[0]
+            else:
+                last = await self._load(owner)
+                if last is None:
+                    self._last.pop(owner, None)
+                    yield None
+                    return
+
+            seq = last + 1
+            with track_submitted() as submitted:
+                try:
+                    yield seq
+                except BaseException:
+                    if submitted():
+                        self._last[owner] = (seq, time.time())
+                    else:
+                        self._last.pop(owner, None)
+                    raise
+            self._last[owner] = (seq, time.time())
+
+    async def observe(self, owner: Pubkey, posts_created: int, fresh: bool = False) -> None:
+        """
+        Feed a counter we just read from the chain (fresh = from the
+        RPC, not the account cache).
+
+        Ahead of us -> somebody else posted for this owner, take it.
+        Equal and fresh -> confirmed, keep counting locally.
+        Behind us and fresh -> a tx we sent didn't land: take it, unless
+        a post is in flight or our last send may still be landing.
+        """
+        entry = self._last.get(owner)
+        now = time.time()
+        if entry is None:
+            if fresh:
+                self._last[owner] = (posts_created, now)
+            return
+
+        last, at = entry
+        if posts_created > last:
+            self._last[owner] = (posts_created, now)
+        elif fresh and posts_created == last:
+            self._last[owner] = (last, now)
+        elif fresh and not self._lock_for(owner).locked() and now - at >= self.settle_secs:
+            log.warning("seq for %s resynced from chain: %d -> %d", owner, last, posts_created)
+            self._last[owner] = (posts_created, now)
+
+    async def invalidate(self, owner: Pubkey) -> None:
+        self._last.pop(owner, None)
+
+
+class RedisOwnerSequencer:
+    """
+    OwnerSequencer for several workers: the per-owner lock and the last
+    seq live in Redis, so posts by one owner stay ordered whichever
+    worker gets them.
+
+    The lock is a token under sol:owner_lock:<owner>, renewed while the
+    post is being sent (a long multi-chunk post can outlive lock_ttl_ms)
+    and released only by its holder.
+    """
+
+    def __init__(
+        self,
+        redis,
+        load: Callable[[Pubkey], Awaitable[Optional[int]]],
+        *,
+        lock_ttl_ms: int = 15_000,
+        lock_wait: float = 60.0,
+        seq_ttl: int = 86400,
+        settle_secs: float = SETTLE_SECS,
+    ):
+        self.redis = redis
+        self._load = load
+        self.lock_ttl_ms = lock_ttl_ms
+        self.lock_wait = lock_wait
+        self.seq_ttl = seq_ttl
+        self.settle_secs = settle_secs
+
+    async def _acquire(self, key: str) -> str:
+        token = secrets.token_hex(8)
+        deadline = asyncio.get_running_loop().time() + self.lock_wait
+        delay = 0.01
+        while not await self.redis.set(key, token, nx=True, px=self.lock_ttl_ms):
+            if asyncio.get_running_loop().time() > deadline:
+                raise TimeoutError(f"owner lock {key} busy for {self.lock_wait}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
+        return token
+
+    async def _keep(self, key: str, token: str) -> None:
+        while True:
+            await asyncio.sleep(self.lock_ttl_ms / 3000)
+            if not await self.redis.eval(RENEW_LUA, 1, key, token, self.lock_ttl_ms):
+                log.warning("lost %s while holding it", key)
+                return
+
+    @asynccontextmanager
+    async def next(self, owner: Pubkey):
+        """
+        Same contract as OwnerSequencer.next().
+        """
+        lock_key = LOCK_PREFIX + str(owner)
+        seq_key = SEQ_PREFIX + str(owner)
+
+        token = await self._acquire(lock_key)
+        keeper = asyncio.create_task(self._keep(lock_key, token))
+        try:
+            raw = await self.redis.get(seq_key)
+            last = None
+            if raw is not None:
+                seq_s, _, at = raw.partition(":")
+                if at and time.time() - float(at) < self.settle_secs:
+                    last = int(seq_s)
+            if last is None:
+                last = await self._load(owner)
+                if last is None:
+                    yield None
+                    return
+
+            seq = last + 1
+            with track_submitted() as submitted:
+                try:
+                    yield seq
+                except BaseException:
+                    if submitted():
+                        await self.redis.set(seq_key, f"{seq}:{time.time()}", ex=self.seq_ttl)
+                    else:
+                        await self.redis.delete(seq_key)
+                    raise
+            await self.redis.set(seq_key, f"{seq}:{time.time()}", ex=self.seq_ttl)
+        finally:
+            keeper.cancel()
+            try:
+                await self.redis.eval(RELEASE_LUA, 1, lock_key, token)
+            except Exception as e:
+                log.warning("releasing %s failed (expires on its own): %s", lock_key, e)
+
+    async def observe(self, owner: Pubkey, posts_created: int, fresh: bool = False) -> None:
+        """
+        Same rules as OwnerSequencer.observe(), atomically in Redis.
+        """
+        try:
+            await self.redis.eval(
+                OBSERVE_LUA, 2, SEQ_PREFIX + str(owner), LOCK_PREFIX + str(owner),
+                posts_created, time.time(), self.settle_secs, int(fresh), self.seq_ttl,
+            )
+        except Exception as e:
+            log.warning("seq observe for %s failed: %s", owner, e)
+
+    async def invalidate(self, owner: Pubkey) -> None:
+        await self.redis.delete(SEQ_PREFIX + str(owner))
@@ -0,0 +1,253 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import socket
+import time
+from typing import Optional, Tuple
+
+from solders.hash import Hash
+from solders.pubkey import Pubkey
+
+log = logging.getLogger("solapi.shared_state")
+
+# State every worker of the service shares through Redis, so it can run
+# as several processes (uvicorn --workers N) or hosts:
+#
+#   sol:leader              worker id of the leader (PX lease)
+#   sol:blockhash           latest blockhash, refreshed by the leader
+#   sol:acct:<pubkey>       short-lived account cache (user PDAs)
+#   sol:idem:<path>:<key>   Idempotency-Key results
+#
+# Per-owner post seq + locks live in sequencer.RedisOwnerSequencer,
+# fee payer balances in fee_payers.BALANCES_KEY, nonce leases in
+# nonces.IN_USE_KEY / SPENT_KEY.
+
+LEADER_KEY = "sol:leader"
+BLOCKHASH_KEY = "sol:blockhash"
+ACCOUNT_PREFIX = "sol:acct:"
+IDEM_PREFIX = "sol:idem:"
+
+# compare-and-renew / compare-and-delete for keys holding an owner token
+RENEW_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+RELEASE_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaderLease:
+    """
+    One worker holds sol:leader and runs the background refreshers
+    (blockhash, fee payer balances); the others follow what it
+    publishes. The lease is renewed every ttl/3, so a dead leader is
+    replaced within ttl.
+
+    Without Redis the only worker is always the leader.
+    """
+
+    def __init__(self, redis, *, ttl_ms: int = 10_000):
+        self.redis = redis
+        self.ttl_ms = ttl_ms
+        self.me = worker_id()
+        self.is_leader = redis is None
+
+    async def tick(self) -> None:
+        if self.redis is None:
+            return
+        try:
+            if self.is_leader:
+                renewed = await self.redis.eval(RENEW_LUA, 1, LEADER_KEY, self.me, self.ttl_ms)
+                if not renewed:
+                    log.warning("worker %s lost leadership", self.me)
+                    self.is_leader = False
+            if not self.is_leader:
+                if await self.redis.set(LEADER_KEY, self.me, nx=True, px=self.ttl_ms):
+                    log.info("worker %s is now leader", self.me)
+                    self.is_leader = True
+        except Exception as e:
+            # can't prove we still hold it -> step down
+            log.warning("leader lease check failed: %s", e)
+            self.is_leader = False
+
+    async def run(self) -> None:
+        while True:
+            await self.tick()
+            await asyncio.sleep(self.ttl_ms / 3000)
+
+    async def resign(self) -> None:
+        if self.redis is not None and self.is_leader:
+            try:
+                await self.redis.eval(RELEASE_LUA, 1, LEADER_KEY, self.me)
+            except Exception:
+                pass
+        self.is_leader = False
+
+
+class BlockhashCache:
+    """
+    Latest blockhash without an RPC round trip per tx.
+
+    The leader fetches it every refresh_secs and publishes it to
+    sol:blockhash; every worker keeps it in memory for local_ttl.
+    If the shared one is missing or older than max_age (leader gone,
+    Redis down) the worker fetches it itself.
+    """
+
+    def __init__(
+        self,
+        redis,
+        *,
+        refresh_secs: float = 1.0,
+        local_ttl: float = 0.5,
+        max_age: float = 5.0,
+    ):
+        self.redis = redis
+        self.refresh_secs = refresh_secs
+        self.local_ttl = local_ttl
+        self.max_age = max_age
+        self._value: Optional[Hash] = None
+        self._at = 0.0
+
+    async def _fetch(self, client) -> Hash:
+        r = await client.get_latest_blockhash()
+        self._value, self._at = r.value.blockhash, time.time()
+        if self.redis is not None:
+            try:
+                await self.redis.set(
+                    BLOCKHASH_KEY,
+                    json.dumps({"blockhash": str(self._value), "at": self._at}),
+                    px=int(self.max_age * 1000),
+                )
+            except Exception as e:
+                log.warning("blockhash publish failed: %s", e)
+        return self._value
+
+    async def get(self, client) -> Hash:
+        now = time.time()
+        if self._value is not None and now - self._at < self.local_ttl:
+            return self._value
+
+        if self.redis is not None:
+            try:
+                raw = await self.redis.get(BLOCKHASH_KEY)
+            except Exception:
+                raw = None
+            if raw:
+                shared = json.loads(raw)
+                if now - shared["at"] < self.max_age:
+                    self._value = Hash.from_string(shared["blockhash"])
+                    # keep it locally for local_ttl from now, not from
+                    # when the leader fetched it
+                    self._at = now
+                    return self._value
+
+        return await self._fetch(client)
+
+    def expire(self) -> None:
+        self._value = None
+
+    async def run(self, client, leader: LeaderLease) -> None:
+        """
+        Background loop: only the leader talks to the RPC.
+        """
+        while True:
+            if leader.is_leader and self.redis is not None:
+                try:
+                    await self._fetch(client)
+                except Exception as e:
+                    log.warning("blockhash refresh failed: %s", e)
+            await asyncio.sleep(self.refresh_secs)
+
+
+class AccountCache:
+    """
+    (data, lamports) of existing accounts for ttl seconds, shared by
+    all workers. Missing accounts are never cached: they're the ones
+    init-user is about to create. Disabled without Redis.
+    """
+
+    def __init__(self, redis, *, ttl: float = 2.0):
+        self.redis = redis
+        self.ttl = ttl
+
+    async def get(self, pubkey: Pubkey) -> Optional[Tuple[bytes, int]]:
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(ACCOUNT_PREFIX + str(pubkey))
+        except Exception:
+            return None
+        if not raw:
+            return None
+        entry = json.loads(raw)
+        return base64.b64decode(entry["d"]), entry["l"]
+
+    async def put(self, pubkey: Pubkey, data: bytes, lamports: int) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(
+                ACCOUNT_PREFIX + str(pubkey),
+                json.dumps({"d": base64.b64encode(data).decode(), "l": lamports}),
+                px=int(self.ttl * 1000),
+            )
+        except Exception as e:
+            log.warning("account cache put for %s failed: %s", pubkey, e)
+
+    async def invalidate(self, *pubkeys: Pubkey) -> None:
+        if self.redis is None or not pubkeys:
+            return
+        try:
+            await self.redis.delete(*(ACCOUNT_PREFIX + str(pk) for pk in pubkeys))
+        except Exception as e:
+            log.warning("account cache invalidate failed: %s", e)
+
+
+class IdempotencyStore:
+    """
+    Results of write requests sent with an Idempotency-Key header, so a
+    retry that lands on any worker gets the first answer instead of a
+    second tx.
+
+    begin() -> None       : we own the key, run the request
+            -> "pending"  : another worker is running it right now
+            -> dict       : finished earlier, {status, body}
+    """
+
+    def __init__(self, redis, *, ttl: int = 86400, pending_ttl: int = 120):
+        self.redis = redis
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None
+
+    async def begin(self, key: str):
+        k = IDEM_PREFIX + key
+        if await self.redis.set(k, "pending", nx=True, ex=self.pending_ttl):
+            return None
+        raw = await self.redis.get(k)
+        if raw is None:
+            # expired between SET and GET, try once more
+            return None if await self.redis.set(k, "pending", nx=True, ex=self.pending_ttl) else "pending"
+        return "pending" if raw == "pending" else json.loads(raw)
+
+    async def complete(self, key: str, status: int, body: str) -> None:
+        await self.redis.set(IDEM_PREFIX + key, json.dumps({"status": status, "body": body}), ex=self.ttl)
+
+    async def abort(self, key: str) -> None:
+        await self.redis.delete(IDEM_PREFIX + key)
@@ -1,11 +1,15 @@
 import asyncio
+import os
+from functools import lru_cache, partial
 import time, struct, base64
 from typing import Optional, List, Tuple
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, ValidationError
 
 import httpx
 from solana.exceptions import SolanaRpcException
+from solana.rpc.core import RPCException
 from solana.rpc.async_api import AsyncClient
 from solders.pubkey import Pubkey
 from solders.keypair import Keypair
@@ -13,11 +17,27 @@ from solders.instruction import Instruction, AccountMeta
 from solders.message import MessageV0
 from solders.transaction import VersionedTransaction
 from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
 from solders.compute_budget import (
     set_compute_unit_price,
     set_compute_unit_limit,
 )
 
+from fee_payers import FeePayerPool
+from nonces import NonceLease, NoncePool
+from sequencer import OwnerSequencer, RedisOwnerSequencer
+from shared_state import AccountCache, BlockhashCache, IdempotencyStore, LeaderLease
+from payload import decode_post, encode_post
+from wallet_stats import WalletStatsPublisher
+from command_bus import CommandConsumer, mark_rejected, mark_submitted
+from like_ingest import LikeIngest
+from tracing import TracedClient, server_span, span
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is optional, only needed with REDIS_URL
+    aioredis = None
+
 # --------- CONFIG ---------
 RPC = "https://api.devnet.solana.com"
 
@@ -34,12 +54,79 @@ MEMO = Pubkey.from_string("MemoSq4gqABAXKb96qnH8TysNcWxMyWCqXgDLGmfcHr")
 
 LAMPORTS_PER_SOL = 1_000_000_000
 
+# Extra keypairs that only pay tx fees (comma-separated base58 secrets).
+# Empty -> ADMIN pays, same as before.
+FEE_PAYERS = [
+    Keypair.from_base58_string(s.strip())
+    for s in os.environ.get("SOL_FEE_PAYERS", "").split(",")
+    if s.strip()
+] or [ADMIN]
+FEE_PAYER_STRATEGY = os.environ.get("SOL_FEE_PAYER_STRATEGY", "least_in_flight")
+FEE_PAYER_MIN_SOL = float(os.environ.get("SOL_FEE_PAYER_MIN_SOL", "0.05"))
+FEE_PAYER_CHECK_SECS = float(os.environ.get("SOL_FEE_PAYER_CHECK_SECS", "60"))
+FEE_PAYER_ALERT_URL = os.environ.get("SOL_FEE_PAYER_ALERT_URL") or None
+
+# ADMIN only has to sign update/post/like/withdraw, it doesn't move lamports.
+# Set SOL_ADMIN_WRITABLE=0 once the deployed program accepts a read-only
+# admin there, so those txs stop write-locking ADMIN.
+# init-user and deposit always keep it writable (ADMIN funds them).
+ADMIN_WRITABLE = os.environ.get("SOL_ADMIN_WRITABLE", "1") != "0"
+
+# Durable nonce accounts (authority = ADMIN) for pre-signed bulk work.
+# 0 disables the /nonce/* endpoints.
+NONCE_POOL_SIZE = int(os.environ.get("SOL_NONCE_POOL_SIZE", "0"))
+NONCE_STATE_PATH = os.environ.get("SOL_NONCE_STATE", "nonce_state.json")
+
+# Skip the "does the user PDA exist" pre-reads on /like, /deposit,
+# /withdraw and let preflight simulation tell us instead.
+OPTIMISTIC_WRITES = os.environ.get("SOL_OPTIMISTIC_WRITES", "1") != "0"
+
+# Redis shared with Laravel (wallet stat snapshots etc). Unset = disabled.
+REDIS_URL = os.environ.get("REDIS_URL") or None
+
+# Several workers (uvicorn --workers N, or several hosts) share hot state
+# through REDIS_URL: post seq + per-owner locks, latest blockhash,
+# a short account cache, Idempotency-Key results, and one elected
+# leader polling the RPC, and /nonce/* leases. Without Redis: single
+# process, in-memory state (nonce leases in SOL_NONCE_STATE).
+SHARED_STATE = os.environ.get("SOL_SHARED_STATE", "1") != "0"
+ACCOUNT_CACHE_TTL = float(os.environ.get("SOL_ACCOUNT_CACHE_TTL", "2"))
+
+# Consume commands Laravel puts on the sol:commands stream (needs REDIS_URL).
+STREAM_CONSUMER = os.environ.get("SOL_STREAM_CONSUMER", "0") != "0"
+STREAM_CONCURRENCY = int(os.environ.get("SOL_STREAM_CONCURRENCY", "16"))
+STREAM_MAX_ATTEMPTS = int(os.environ.get("SOL_STREAM_MAX_ATTEMPTS", "3"))
+
+# naive memo-chunking: bytes of (possibly compressed) payload per chunk tx
+POST_CHUNK_SIZE = 200
+
+# /read-users: owners per request, and per getMultipleAccounts call (RPC max 100)
+READ_USERS_MAX = 1000
+READ_USERS_BATCH = 100
+
 # --------- APP ---------
 app = FastAPI()
 client: Optional[AsyncClient] = None
+redis = None
+fee_payers = FeePayerPool(
+    FEE_PAYERS,
+    strategy=FEE_PAYER_STRATEGY,
+    low_balance_lamports=int(FEE_PAYER_MIN_SOL * LAMPORTS_PER_SOL),
+    alert_url=FEE_PAYER_ALERT_URL,
+)
+fee_payer_monitor: Optional[asyncio.Task] = None
+command_consumer: Optional[asyncio.Task] = None
+leader = LeaderLease(None)
+leader_task: Optional[asyncio.Task] = None
+blockhashes = BlockhashCache(None)
+blockhash_task: Optional[asyncio.Task] = None
+accounts = AccountCache(None, ttl=ACCOUNT_CACHE_TTL)
+idempotency = IdempotencyStore(None)
+nonce_pool = NoncePool(ADMIN.pubkey(), NONCE_POOL_SIZE, NONCE_STATE_PATH)
 
 
 # --------- UTILS ---------
+@lru_cache(maxsize=100_000)
 def user_pda_for(owner: Pubkey) -> Pubkey:
     """
     Derive the per-user PDA for our program:
@@ -49,6 +136,13 @@ def user_pda_for(owner: Pubkey) -> Pubkey:
     return pda
 
 
+def admin_meta() -> AccountMeta:
+    """
+    ADMIN as a signer for instructions where it doesn't pay for anything.
+    """
+    return AccountMeta(ADMIN.pubkey(), True, ADMIN_WRITABLE)
+
+
 def pack_username_32(s: str) -> bytes:
     """
     Program stores username as fixed 32 bytes (null padded).
@@ -101,7 +195,7 @@ def ix_update_user(
     struct.pack_into("<Q", buf, 49, likes_given)
 
     metas = [
-        AccountMeta(ADMIN.pubkey(), True, True),
+        admin_meta(),
         AccountMeta(owner, False, False),
         AccountMeta(user_pda, False, True),
     ]
@@ -140,7 +234,7 @@ def ix_withdraw(owner: Pubkey, lamports: int) -> Instruction:
     struct.pack_into("<Q", buf, 1, lamports)
 
     metas = [
-        AccountMeta(ADMIN.pubkey(), True, True),
+        admin_meta(),
         AccountMeta(owner, False, True),
         AccountMeta(user_pda, False, True),
     ]
@@ -187,7 +281,7 @@ def pack_post_ix(
         buf[40 : 40 + len(content)] = content
 
     metas = [
-        AccountMeta(ADMIN.pubkey(), True, True),
+        admin_meta(),
         AccountMeta(owner, False, False),
         AccountMeta(user_pda, False, True),
         AccountMeta(MEMO, False, False),
@@ -214,7 +308,7 @@ def pack_like_ix(post_owner: Pubkey, post_seq: int, liker: Pubkey) -> Instructio
     struct.pack_into("<Q", buf, 73, int(time.time()))
 
     metas = [
-        AccountMeta(ADMIN.pubkey(), True, True),
+        admin_meta(),
         AccountMeta(liker, False, False),
         AccountMeta(user_pda_for(liker), False, True),
         AccountMeta(post_owner, False, False),
@@ -223,34 +317,188 @@ def pack_like_ix(post_owner: Pubkey, post_seq: int, liker: Pubkey) -> Instructio
     return Instruction(PROGRAM_ID, bytes(buf), metas)
 
 
-async def send(ixs: List[Instruction]) -> str:
+def split_post(text: str) -> Tuple[List[bytes], str]:
     """
-    Build and send a single tx including compute budget tweaks.
+    Encode post text (compressed when that's smaller, see payload.py)
+    and cut it into chunk payloads, one per tx.
+    Returns (parts, codec name).
     """
-    rb = await client.get_latest_blockhash()
+    full_bytes, codec = encode_post(text)
+    parts = [
+        full_bytes[i : i + POST_CHUNK_SIZE]
+        for i in range(0, len(full_bytes), POST_CHUNK_SIZE)
+    ] or [b""]
+    return parts, codec
 
+
+def text_slices(text: str, n: int) -> List[str]:
+    """
+    Split text into n pieces that join back to text.
+    Compressed chunks aren't readable on their own, so this is what
+    we report as each chunk's content.
+    """
+    step = -(-len(text) // n) if text else 0
+    return [text[i * step : (i + 1) * step] for i in range(n)]
+
+
+def post_ixs(owner: Pubkey, text: str) -> List[Instruction]:
+    """
+    One pack_post_ix per chunk, head first.
+    """
+    parts, _codec = split_post(text)
+    return [
+        pack_post_ix(
+            owner,
+            is_head=(idx == 1),
+            chunk_id=idx,
+            chunk_total=len(parts),
+            content=part,
+        )
+        for idx, part in enumerate(parts, start=1)
+    ]
+
+
+def build_tx(
+    ixs: List[Instruction],
+    payer: Keypair,
+    blockhash,
+    nonce: Optional[NonceLease] = None,
+) -> VersionedTransaction:
+    """
+    Compile + sign a tx including compute budget tweaks.
+    With a nonce lease, advance_nonce goes first and the durable
+    nonce replaces the recent blockhash.
+    """
     # ask for higher compute limit + tip 0
     cu_limit_ix = set_compute_unit_limit(400_000)
     cu_price_ix = set_compute_unit_price(0)
 
+    head = [nonce.advance_ix(ADMIN.pubkey())] if nonce else []
     msg = MessageV0.try_compile(
-        ADMIN.pubkey(),
-        [cu_limit_ix, cu_price_ix, *ixs],
+        payer.pubkey(),
+        [*head, cu_limit_ix, cu_price_ix, *ixs],
         [],
-        rb.value.blockhash,
+        nonce.nonce if nonce else blockhash,
     )
-    tx = VersionedTransaction(msg, [ADMIN])
-    resp = await client.send_transaction(tx)
-    return str(getattr(resp, "value", resp))
+    signers = [payer] if payer.pubkey() == ADMIN.pubkey() else [payer, ADMIN]
+    return VersionedTransaction(msg, signers)
 
 
-async def get_user_account_info(owner: Pubkey) -> Tuple[Optional[bytes], int]:
+async def send(ixs: List[Instruction]) -> str:
+    """
+    Build and send a single tx.
+    Fees are paid by a keypair from the fee payer pool,
+    ADMIN only co-signs for the program.
+    """
+    async with fee_payers.lease() as payer:
+        tx = build_tx(ixs, payer, await blockhashes.get(client))
+        mark_submitted()
+        try:
+            resp = await client.send_transaction(tx)
+        except RPCException as e:
+            if preflight_failure(e) is not None:
+                mark_rejected()
+            raise
+        return str(getattr(resp, "value", resp))
+
+
+# --------- SIMULATION ERRORS ---------
+# What a missing / uninitialized user PDA looks like in a failed
+# preflight (runtime error text + common program log lines).
+MISSING_ACCOUNT_MARKERS = (
+    "requires an initialized account",
+    "uninitialized",
+    "accountnotinitialized",
+    "invalid account data",
+    "account data too small",
+    "incorrect program id",
+    "provided owner is not allowed",
+)
+
+
+def preflight_failure(e: RPCException) -> Optional[dict]:
+    """
+    Pull err + logs out of a failed preflight simulation.
+    None if the exception is some other RPC error.
+    """
+    msg = e.args[0] if e.args else None
+    sim = getattr(msg, "data", None)
+    if sim is None or not hasattr(sim, "logs"):
+        return None
+    return {
+        "message": getattr(msg, "message", str(msg)),
+        "err": str(sim.err),
+        "logs": list(sim.logs or []),
+    }
+
+
+def is_missing_account(failure: dict) -> bool:
+    text = " ".join([failure["message"], *failure["logs"]]).lower()
+    return any(m in text for m in MISSING_ACCOUNT_MARKERS)
+
+
+async def require_users(checks: List[Tuple[Pubkey, str]]) -> None:
+    """
+    The old pre-reads: 400 with `detail` for the first owner
+    that has no user PDA.
+    """
+    for owner, detail in checks:
+        if await get_user_bytes(owner) is None:
+            raise HTTPException(status_code=400, detail=detail)
+
+
+async def send_checked(
+    ixs: List[Instruction],
+    checks: List[Tuple[Pubkey, str]],
+) -> str:
+    """
+    send() for writes that need existing user PDAs.
+
+    Optimistic mode sends straight away (1 RPC when all is well).
+    If preflight fails because an account isn't initialized we only
+    then read the PDAs, so the caller gets the same user_not_found
+    details as with the pre-reads. Any other program failure becomes
+    a 400 with the simulation err + tail of the logs.
+    """
+    if not OPTIMISTIC_WRITES:
+        await require_users(checks)
+        return await send(ixs)
+
+    try:
+        return await send(ixs)
+    except RPCException as e:
+        failure = preflight_failure(e)
+        if failure is None:
+            raise
+        if is_missing_account(failure):
+            await require_users(checks)
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "simulation_failed",
+                "err": failure["err"],
+                "logs": failure["logs"][-10:],
+            },
+        )
+
+
+async def get_user_account_info(
+    owner: Pubkey,
+    fresh: bool = False,
+    commitment: Optional[str] = None,
+) -> Tuple[Optional[bytes], int]:
     """
     Return (raw_user_bytes, lamports) for the user's PDA.
     If PDA doesn't exist, (None, 0).
+    Served from the shared account cache unless fresh=True.
     """
     pda = user_pda_for(owner)
-    r = await client.get_account_info(pda, encoding="base64")
+    if not fresh:
+        cached = await accounts.get(pda)
+        if cached is not None:
+            return cached
+
+    r = await client.get_account_info(pda, commitment=commitment, encoding="base64")
     if r.value is None:
         return None, 0
 
@@ -264,6 +512,7 @@ async def get_user_account_info(owner: Pubkey) -> Tuple[Optional[bytes], int]:
     if isinstance(data, tuple):
         data = base64.b64decode(data[0])
 
+    await accounts.put(pda, data, lamports)
     return data, lamports
 
 
@@ -300,18 +549,213 @@ def parse_user(raw: bytes):
     }
 
 
+async def load_posts_created(owner: Pubkey) -> Optional[int]:
+    """
+    posts_created counter from the user PDA (None if no PDA).
+    Seeds the sequencer, so never from cache, and at 'confirmed': the
+    client default (finalized) can still miss a post from a minute ago.
+    """
+    raw, _lamports = await get_user_account_info(owner, fresh=True, commitment="confirmed")
+    if raw is None:
+        return None
+    return struct.unpack_from("<Q", raw, 32)[0]
+
+
+sequencer = OwnerSequencer(load_posts_created)
+
+
+async def read_wallet_stats(owner: Pubkey, fresh: bool = False) -> dict:
+    """
+    Snapshot of the user's PDA: exists + parsed stats + balance_sol.
+    This is what /read-user returns and what we push to Redis.
+    """
+    raw_bytes, lamports = await get_user_account_info(owner, fresh)
+    if not raw_bytes:
+        return {
+            "exists": False,
+            "username": None,
+            "posts_created": 0,
+            "likes_received": 0,
+            "likes_given": 0,
+            "balance_sol": 0,
+        }
+
+    user_struct = parse_user(raw_bytes)
+    await sequencer.observe(owner, user_struct["posts_created"], fresh)
+    return {
+        "exists": True,
+        **user_struct,
+        "balance_sol": lamports_to_sol(lamports),
+    }
+
+
+# post-write refreshes must see the new PDA, not a cached one
+wallet_stats = WalletStatsPublisher(None, partial(read_wallet_stats, fresh=True))
+
+
+async def after_write(*owners: Pubkey) -> None:
+    """
+    Drop the cached PDAs of owners we just wrote to and republish
+    their stats once the tx had time to land.
+    """
+    await accounts.invalidate(*(user_pda_for(o) for o in owners))
+    wallet_stats.refresh_soon(*owners)
+
+
+async def send_like(post_owner: Pubkey, post_seq: int, liker: Pubkey) -> str:
+    """
+    The actual like tx (both user PDAs must exist).
+    """
+    ix = pack_like_ix(post_owner, post_seq, liker)
+    sig = await send_checked(
+        [ix],
+        [
+            (liker, "liker_user_not_found: call /init-user first"),
+            (post_owner, "post_owner_user_not_found"),
+        ],
+    )
+    await after_write(liker, post_owner)
+    return sig
+
+
+async def like_sig_statuses(sigs: List[str]) -> List[Optional[bool]]:
+    """
+    Per sig: True confirmed, False failed, None not (yet) confirmed.
+    """
+    r = await client.get_signature_statuses([Signature.from_string(s) for s in sigs])
+    out: List[Optional[bool]] = []
+    for st in r.value:
+        if st is not None and st.err is not None:
+            out.append(False)
+        elif st is not None and st.confirmation_status in (
+            TransactionConfirmationStatus.Confirmed,
+            TransactionConfirmationStatus.Finalized,
+        ):
+            out.append(True)
+        else:
+            out.append(None)
+    return out
+
+
+likes = LikeIngest(None, send_like, like_sig_statuses)
+
+
 # --------- LIFECYCLE ---------
 @app.on_event("startup")
 async def startup():
-    global client
-    client = AsyncClient(RPC, timeout=30.0)
+    global client, redis, fee_payer_monitor, command_consumer
+    global sequencer, leader_task, blockhash_task
+    client = TracedClient(AsyncClient(RPC, timeout=30.0))
+    if REDIS_URL and aioredis is not None:
+        redis = aioredis.from_url(REDIS_URL, decode_responses=True)
+        wallet_stats.redis = redis
+        likes.redis = redis
+        if SHARED_STATE:
+            leader.redis = redis
+            leader.is_leader = False
+            await leader.tick()
+            leader_task = asyncio.create_task(leader.run())
+            blockhashes.redis = redis
+            blockhash_task = asyncio.create_task(blockhashes.run(client, leader))
+            accounts.redis = redis
+            idempotency.redis = redis
+            nonce_pool.redis = redis
+            sequencer = RedisOwnerSequencer(redis, load_posts_created)
+        if STREAM_CONSUMER:
+            consumer = CommandConsumer(
+                redis,
+                command_handlers(),
+                concurrency=STREAM_CONCURRENCY,
+                max_attempts=STREAM_MAX_ATTEMPTS,
+            )
+            command_consumer = asyncio.create_task(consumer.run())
+    fee_payer_monitor = asyncio.create_task(
+        fee_payers.monitor(client, FEE_PAYER_CHECK_SECS, leader)
+    )
+    if NONCE_POOL_SIZE > 0:
+        await nonce_pool.load(client)
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    if fee_payer_monitor is not None:
+        fee_payer_monitor.cancel()
+    if command_consumer is not None:
+        command_consumer.cancel()
+    for task in (leader_task, blockhash_task):
+        if task is not None:
+            task.cancel()
+    await leader.resign()
+    if redis is not None:
+        await redis.aclose()
     await client.close()
 
 
+# --------- TRACING ---------
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """
+    Root span per request, continuing Laravel's traceparent.
+    RPC calls (TracedClient) and chunk sends become child spans.
+    """
+    with server_span(
+        f"{request.method} {request.url.path}",
+        request.headers.get("traceparent"),
+        **{"http.method": request.method, "http.target": request.url.path},
+    ) as root:
+        resp = await call_next(request)
+        # name by route template so /read-user/<wallet> groups together
+        route = request.scope.get("route")
+        if route is not None:
+            root.name = f"{request.method} {route.path}"
+        root.attrs["http.status_code"] = resp.status_code
+        return resp
+
+
+# --------- IDEMPOTENCY ---------
+@app.middleware("http")
+async def idempotent_writes(request: Request, call_next):
+    """
+    POST with an Idempotency-Key header: the first response is stored
+    (shared across workers) and replayed for retries with the same key.
+    A retry while the first is still running gets 409.
+    Server errors aren't stored, so those can be retried for real.
+    """
+    key = request.headers.get("idempotency-key")
+    if request.method != "POST" or not key or not idempotency.enabled:
+        return await call_next(request)
+
+    key = f"{request.url.path}:{key}"
+    try:
+        prior = await idempotency.begin(key)
+    except Exception:
+        return await call_next(request)  # Redis down: behave as if no key
+
+    if prior == "pending":
+        return JSONResponse({"detail": "request_in_progress"}, status_code=409)
+    if prior is not None:
+        return Response(
+            prior["body"],
+            status_code=prior["status"],
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    try:
+        resp = await call_next(request)
+        body = b"".join([chunk async for chunk in resp.body_iterator])
+    except BaseException:
+        await idempotency.abort(key)
+        raise
+
+    if resp.status_code >= 500:
+        await idempotency.abort(key)
+    else:
+        await idempotency.complete(key, resp.status_code, body.decode("utf-8", errors="replace"))
+
+    return Response(body, status_code=resp.status_code, headers=dict(resp.headers))
+
+
 # --------- SCHEMAS ---------
 class InitUserReq(BaseModel):
     owner: str
@@ -346,12 +790,52 @@ class WithdrawReq(BaseModel):
     amount_sol: float = Field(gt=0)
 
 
+class UpdateUserReq(BaseModel):
+    owner: str
+    username: str = Field(max_length=32)
+    posts: int = Field(ge=0)
+    likes_recv: int = Field(ge=0)
+    likes_given: int = Field(ge=0)
+
+
+class ReadUsersReq(BaseModel):
+    owners: List[str] = Field(min_length=1, max_length=READ_USERS_MAX)
+
+
+class NonceEnsureReq(BaseModel):
+    count: int = Field(gt=0)
+
+
+class PresignJob(BaseModel):
+    """
+    kind = init-user | update-user | deposit | withdraw | post | like
+    args = same body the matching endpoint takes
+    """
+    kind: str
+    args: dict
+
+
+class PresignReq(BaseModel):
+    jobs: List[PresignJob] = Field(min_length=1)
+    label: str = "bulk"
+
+
+class NonceSubmitReq(BaseModel):
+    txs: List[str] = Field(min_length=1)  # base64 signed txs from /nonce/presign
+
+
+class NonceReleaseReq(BaseModel):
+    nonce_accounts: List[str] = Field(min_length=1)
+
+
 # --------- ENDPOINTS ---------
 @app.get("/")
 async def root():
     return {
         "ok": True,
         "service": "solapi",
+        "worker": leader.me,
+        "leader": leader.is_leader,
         "endpoints": [
             "/init-user",
             "/post",
@@ -360,6 +844,13 @@ async def root():
             "/withdraw",
             "/read-post/{sig}",
             "/read-user/{owner_b58}",
+            "/read-users",
+            "/fee-payers",
+            "/nonce/status",
+            "/nonce/ensure",
+            "/nonce/presign",
+            "/nonce/submit",
+            "/nonce/release",
         ],
     }
 
@@ -373,8 +864,10 @@ async def init_user(req: InitUserReq):
     # poll for PDA to appear (devnet can lag)
     deadline = time.time() + 6.0
     while time.time() < deadline:
-        raw, _lamports = await get_user_account_info(owner)
+        raw, _lamports = await get_user_account_info(owner, fresh=True)
         if raw is not None:
+            await sequencer.observe(owner, parse_user(raw)["posts_created"], fresh=True)
+            await after_write(owner)
             return {"ok": True, "sig": sig}
         await asyncio.sleep(0.4)
 
@@ -390,29 +883,33 @@ async def post_text(req: PostReq):
     """
     Create a post as multiple chunks.
     We bump compute budget for each chunk tx.
+
+    seq comes from the per-owner sequencer, which also keeps
+    posts by the same owner in order.
     """
     owner = Pubkey.from_string(req.owner)
 
-    raw_user = await get_user_bytes(owner)
-    if raw_user is None:
-        raise HTTPException(
-            status_code=400,
-            detail="user_not_found: call /init-user first",
-        )
+    async with sequencer.next(owner) as seq:
+        if seq is None:
+            raise HTTPException(
+                status_code=400,
+                detail="user_not_found: call /init-user first",
+            )
+        out = await send_post(owner, seq, req.text)
 
-    prev = struct.unpack_from("<Q", raw_user, 32)[0]
-    predicted_seq = prev + 1
+    await after_write(owner)
+    return out
 
-    full_bytes = req.text.encode("utf-8")
 
-    # naive memo-chunking
-    CHUNK_SIZE = 200
-    parts = [
-        full_bytes[i : i + CHUNK_SIZE]
-        for i in range(0, len(full_bytes), CHUNK_SIZE)
-    ] or [b""]
+async def send_post(owner: Pubkey, seq: int, text: str) -> dict:
+    parts, codec = split_post(text)
     total_parts = len(parts)
 
+    if codec == "plain":
+        chunk_texts = [p.decode("utf-8", errors="replace") for p in parts]
+    else:
+        chunk_texts = text_slices(text, total_parts)
+
     tx_sigs: List[str] = []
     returned_chunks = []
 
@@ -446,7 +943,8 @@ async def post_text(req: PostReq):
         except Exception:
             pass
 
-        sig = await send([ix])
+        with span("post.chunk", chunk=idx, total=total_parts, bytes=len(part)):
+            sig = await send([ix])
         tx_sigs.append(sig)
 
         returned_chunks.append(
@@ -454,7 +952,7 @@ async def post_text(req: PostReq):
                 "index": idx,
                 "total": total_parts,
                 "tx_signature": sig,
-                "content_utf8": part.decode("utf-8", errors="replace"),
+                "content_utf8": chunk_texts[idx - 1],
             }
         )
 
@@ -463,7 +961,8 @@ async def post_text(req: PostReq):
     return {
         "ok": True,
         "owner": str(owner),
-        "seq": predicted_seq,
+        "seq": seq,
+        "encoding": codec,
         "root_sig": root_sig,
         "tx_sigs": tx_sigs,
         "chunks": returned_chunks,
@@ -472,24 +971,16 @@ async def post_text(req: PostReq):
 
 @app.post("/like")
 async def like(req: LikeReq):
+    """
+    Goes through the like ingest: a repeated like (same post + liker)
+    returns the first sig with duplicate=true instead of a new tx.
+    While another worker is still sending it: sig null, pending=true.
+    """
     post_owner = Pubkey.from_string(req.post_owner)
     liker = Pubkey.from_string(req.liker)
 
-    # both sides must already have PDA accounts
-    if await get_user_bytes(liker) is None:
-        raise HTTPException(
-            status_code=400,
-            detail="liker_user_not_found: call /init-user first",
-        )
-    if await get_user_bytes(post_owner) is None:
-        raise HTTPException(
-            status_code=400,
-            detail="post_owner_user_not_found",
-        )
-
-    ix = pack_like_ix(post_owner, req.post_seq, liker)
-    sig = await send([ix])
-    return {"ok": True, "sig": sig}
+    sig, duplicate = await likes.like(post_owner, req.post_seq, liker)
+    return {"ok": True, "sig": sig, "duplicate": duplicate, "pending": sig is None}
 
 
 @app.post("/deposit")
@@ -499,18 +990,15 @@ async def deposit(req: DepositReq):
     amount_sol -> lamports, then we build ix_deposit.
     """
     owner = Pubkey.from_string(req.owner)
-
-    # user must already exist on-chain
-    if await get_user_bytes(owner) is None:
-        raise HTTPException(
-            status_code=400,
-            detail="user_not_found: call /init-user first",
-        )
-
     lamports = int(req.amount_sol * LAMPORTS_PER_SOL)
 
+    # user must already exist on-chain
     ix = ix_deposit(owner, lamports)
-    sig = await send([ix])
+    sig = await send_checked(
+        [ix],
+        [(owner, "user_not_found: call /init-user first")],
+    )
+    await after_write(owner)
     return {
         "ok": True,
         "sig": sig,
@@ -525,17 +1013,14 @@ async def withdraw(req: WithdrawReq):
     Move SOL from the user's PDA back to their wallet.
     """
     owner = Pubkey.from_string(req.owner)
-
-    if await get_user_bytes(owner) is None:
-        raise HTTPException(
-            status_code=400,
-            detail="user_not_found: call /init-user first",
-        )
-
     lamports = int(req.amount_sol * LAMPORTS_PER_SOL)
 
     ix = ix_withdraw(owner, lamports)
-    sig = await send([ix])
+    sig = await send_checked(
+        [ix],
+        [(owner, "user_not_found: call /init-user first")],
+    )
+    await after_write(owner)
     return {
         "ok": True,
         "sig": sig,
@@ -545,23 +1030,36 @@ async def withdraw(req: WithdrawReq):
 
 
 @app.get("/read-post/{sig}")
-async def read_post(sig: str):
+async def read_post(sig: str, also: str = ""):
     """
-    Reassemble a post by reading all Memo logs from the tx.
+    Reassemble a post by reading the Memo logs of its txs.
     We assume each chunk was emitted by Memo as "F4HPOST|1|...."
+
+    Every chunk is its own tx, so `sig` alone only has one chunk: pass
+    the other chunk sigs as ?also=sig2,sig3 (Laravel has them in
+    post_chunks). If chunks are still missing we say so (complete=false,
+    text null) rather than return part of the text: a piece of a
+    compressed post can't be decoded on its own.
+    Compressed payloads (payload.py envelope) are inflated here,
+    plain ones pass through.
     """
-    try:
-        r = await client.get_transaction(
-            tx_sig=Signature.from_string(sig),
-            max_supported_transaction_version=0,
-        )
-    except (httpx.ReadTimeout, SolanaRpcException):
-        raise HTTPException(404, "tx not available yet")
+    sigs = list(dict.fromkeys([sig, *(s for s in also.split(",") if s)]))
 
-    if r.value is None:
-        raise HTTPException(404, "tx not found")
+    async def fetch(s: str):
+        try:
+            r = await client.get_transaction(
+                tx_sig=Signature.from_string(s),
+                max_supported_transaction_version=0,
+            )
+        except (httpx.ReadTimeout, SolanaRpcException):
+            raise HTTPException(404, "tx not available yet")
+        except ValueError:
+            raise HTTPException(422, f"bad signature: {s}")
+        if r.value is None:
+            raise HTTPException(404, "tx not found")
+        return r.value.transaction.meta.log_messages or []
 
-    logs = r.value.transaction.meta.log_messages or []
+    logs = [line for tx_logs in await asyncio.gather(*(fetch(s) for s in sigs)) for line in tx_logs]
 
     def parse(line: str):
         if "Memo" not in line:
@@ -583,7 +1081,7 @@ async def read_post(sig: str):
             return None
         return (cid, tot, chunk)
 
-    chunks = []
+    chunks = {}
     ctot = None
 
     for line in logs:
@@ -591,22 +1089,32 @@ async def read_post(sig: str):
         if not p:
             continue
         cid, tot, chunk = p
-        chunks.append((cid, chunk))
+        chunks[cid] = chunk
         ctot = tot
 
     if not chunks:
         raise HTTPException(404, "no F4HPOST memo found")
 
-    chunks.sort(key=lambda x: x[0])
-    content = b"".join(c for _, c in chunks)
-
+    missing = [i for i in range(1, (ctot or 0) + 1) if i not in chunks]
+    if missing:
+        return {
+            "ok": True,
+            "complete": False,
+            "chunks": len(chunks),
+            "chunk_total": ctot,
+            "missing": missing,
+            "text": None,
+        }
+
+    content = b"".join(chunks[i] for i in sorted(chunks))
     try:
-        text = content.decode("utf-8")
-    except UnicodeDecodeError:
-        text = content.hex()
+        text = decode_post(content).decode("utf-8")
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(422, f"undecodable_post: {e}")
 
     return {
         "ok": True,
+        "complete": True,
         "chunks": len(chunks),
         "chunk_total": ctot,
         "text": text,
@@ -618,19 +1126,282 @@ async def read_user(owner_b58: str):
     """
     Return user's on-chain profile data + PDA balance.
     balance_sol = PDA lamports / LAMPORTS_PER_SOL
+    Whatever we read is also pushed to Redis for the PHP side.
     """
     owner = Pubkey.from_string(owner_b58)
 
-    raw_bytes, lamports = await get_user_account_info(owner)
-    if not raw_bytes:
-        raise HTTPException(404, "user_not_found")
+    snapshot = await read_wallet_stats(owner)
+    await wallet_stats.publish(owner, snapshot)
 
-    user_struct = parse_user(raw_bytes)
+    if not snapshot["exists"]:
+        raise HTTPException(404, "user_not_found")
 
     return {
         "ok": True,
-        "user": {
-            **user_struct,
-            "balance_sol": lamports_to_sol(lamports),
-        },
+        "user": {k: v for k, v in snapshot.items() if k != "exists"},
+    }
+
+
+@app.post("/read-users")
+async def read_users(req: ReadUsersReq):
+    """
+    /read-user for many owners at once (the Laravel profiles:sync job):
+    one getMultipleAccounts per READ_USERS_BATCH PDAs instead of one
+    getAccountInfo per owner. Always read from the RPC, never the cache.
+
+    users[owner] = exists + stats + balance_sol + lamports,
+    invalid = owners that aren't pubkeys.
+    """
+    owners: List[Pubkey] = []
+    invalid: List[str] = []
+    for o in dict.fromkeys(req.owners):
+        try:
+            owners.append(Pubkey.from_string(o))
+        except ValueError:
+            invalid.append(o)
+
+    users = {}
+    for i in range(0, len(owners), READ_USERS_BATCH):
+        batch = owners[i:i + READ_USERS_BATCH]
+        pdas = [user_pda_for(o) for o in batch]
+        r = await client.get_multiple_accounts(pdas, encoding="base64")
+
+        for owner, pda, acc in zip(batch, pdas, r.value):
+            if acc is None:
+                snapshot = {
+                    "exists": False,
+                    "username": None,
+                    "posts_created": 0,
+                    "likes_received": 0,
+                    "likes_given": 0,
+                    "balance_sol": 0,
+                }
+                lamports = 0
+            else:
+                data = acc.data
+                if isinstance(data, tuple):
+                    data = base64.b64decode(data[0])
+                lamports = acc.lamports
+                await accounts.put(pda, data, lamports)
+                snapshot = {
+                    "exists": True,
+                    **parse_user(data),
+                    "balance_sol": lamports_to_sol(lamports),
+                }
+            await wallet_stats.publish(owner, snapshot)
+            users[str(owner)] = {**snapshot, "lamports": lamports}
+
+    return {"ok": True, "users": users, "invalid": invalid}
+
+
+@app.get("/fee-payers")
+async def fee_payers_status():
+    """
+    Pool status: in-flight sends, last known balances, low-balance flags.
+    """
+    return {"ok": True, **fee_payers.status()}
+
+
+# --------- DURABLE NONCE MODE ---------
+def job_txs(job: PresignJob) -> List[List[Instruction]]:
+    """
+    Instructions for one presign job, one inner list per tx.
+    Posts take one tx per chunk, everything else is a single tx.
+    """
+    a = job.args
+    if job.kind == "init-user":
+        r = InitUserReq(**a)
+        return [[ix_init_user(Pubkey.from_string(r.owner), r.username)]]
+    if job.kind == "update-user":
+        r = UpdateUserReq(**a)
+        return [[
+            ix_update_user(
+                Pubkey.from_string(r.owner),
+                r.username,
+                r.posts,
+                r.likes_recv,
+                r.likes_given,
+            )
+        ]]
+    if job.kind == "deposit":
+        r = DepositReq(**a)
+        lamports = int(r.amount_sol * LAMPORTS_PER_SOL)
+        return [[ix_deposit(Pubkey.from_string(r.owner), lamports)]]
+    if job.kind == "withdraw":
+        r = WithdrawReq(**a)
+        lamports = int(r.amount_sol * LAMPORTS_PER_SOL)
+        return [[ix_withdraw(Pubkey.from_string(r.owner), lamports)]]
+    if job.kind == "post":
+        r = PostReq(**a)
+        return [[ix] for ix in post_ixs(Pubkey.from_string(r.owner), r.text)]
+    if job.kind == "like":
+        r = LikeReq(**a)
+        return [[
+            pack_like_ix(
+                Pubkey.from_string(r.post_owner),
+                r.post_seq,
+                Pubkey.from_string(r.liker),
+            )
+        ]]
+    raise HTTPException(400, f"unknown job kind: {job.kind}")
+
+
+def nonce_account_of(tx: VersionedTransaction) -> Pubkey:
+    """
+    advance_nonce is always instruction 0; its first account is the nonce.
+    """
+    msg = tx.message
+    first = msg.instructions[0]
+    return msg.account_keys[first.accounts[0]]
+
+
+def require_nonce_mode():
+    if NONCE_POOL_SIZE <= 0:
+        raise HTTPException(400, "nonce_mode_disabled: set SOL_NONCE_POOL_SIZE")
+
+
+@app.get("/nonce/status")
+async def nonce_status():
+    require_nonce_mode()
+    return {"ok": True, **(await nonce_pool.status())}
+
+
+@app.post("/nonce/ensure")
+async def nonce_ensure(req: NonceEnsureReq):
+    """
+    Create nonce accounts (rent paid by ADMIN) up to req.count.
+    """
+    require_nonce_mode()
+    sigs = await nonce_pool.ensure(client, req.count, send)
+    return {"ok": True, "created": len(sigs), "sigs": sigs, **(await nonce_pool.status())}
+
+
+@app.post("/nonce/presign")
+async def nonce_presign(req: PresignReq):
+    """
+    Sign a batch of jobs against durable nonces.
+    The returned txs don't expire: queue them, hand them to another
+    worker, and push them through /nonce/submit whenever.
+    No blockhash fetch, one getMultipleAccounts per 100 nonces.
+    """
+    require_nonce_mode()
+    planned = []
+    for i, job in enumerate(req.jobs):
+        try:
+            planned += [(i, ixs) for ixs in job_txs(job)]
+        except ValidationError as e:
+            raise HTTPException(422, {"job": i, "errors": e.errors(include_url=False, include_context=False)})
+        except ValueError as e:  # bad pubkey
+            raise HTTPException(422, {"job": i, "error": str(e)})
+        except HTTPException as e:
+            raise HTTPException(e.status_code, {"job": i, "error": e.detail})
+
+    try:
+        leases = await nonce_pool.acquire(client, len(planned), req.label)
+    except LookupError as e:
+        raise HTTPException(409, str(e))
+
+    out = []
+    for (job_idx, ixs), lease in zip(planned, leases):
+        payer = fee_payers.acquire()
+        try:
+            tx = build_tx(ixs, payer, None, nonce=lease)
+        finally:
+            fee_payers.release(payer)
+        out.append(
+            {
+                "job": job_idx,
+                "nonce_account": str(lease.pubkey),
+                "tx": base64.b64encode(bytes(tx)).decode(),
+            }
+        )
+
+    return {"ok": True, "count": len(out), "txs": out}
+
+
+@app.post("/nonce/submit")
+async def nonce_submit(req: NonceSubmitReq):
+    """
+    Send pre-signed nonce txs concurrently and give their
+    nonce accounts back to the pool.
+    """
+    require_nonce_mode()
+
+    async def one(b64: str):
+        try:
+            tx = VersionedTransaction.from_bytes(base64.b64decode(b64))
+            nonce_pk = nonce_account_of(tx)
+        except Exception:
+            # not ours to release: we can't tell which nonce it was signed with
+            return {"ok": False, "error": "bad_tx"}
+        # rejected in preflight -> the nonce is untouched, reuse it now;
+        # anything else may still land -> reused once the nonce advanced
+        sent = True
+        try:
+            mark_submitted()
+            resp = await client.send_raw_transaction(bytes(tx))
+            return {"ok": True, "sig": str(resp.value)}
+        except Exception as e:
+            if isinstance(e, RPCException) and preflight_failure(e) is not None:
+                mark_rejected()
+                sent = False
+            return {"ok": False, "error": str(e)}
+        finally:
+            await nonce_pool.release(nonce_pk, sent=sent)
+
+    results = await asyncio.gather(*(one(t) for t in req.txs))
+    return {
+        "ok": all(r["ok"] for r in results),
+        "sent": sum(1 for r in results if r["ok"]),
+        "results": results,
+    }
+
+
+@app.post("/nonce/release")
+async def nonce_release(req: NonceReleaseReq):
+    """
+    Discard pre-signed txs that will never be sent.
+
+    Also frees accounts still waiting for a sent tx to land (its nonce
+    hasn't advanced). That tx never expires: until the nonce moves on,
+    treat its sig as possibly live and don't re-sign the same job.
+    """
+    require_nonce_mode()
+    accounts = []
+    for i, pk in enumerate(req.nonce_accounts):
+        try:
+            accounts.append(Pubkey.from_string(pk))
+        except ValueError as e:
+            raise HTTPException(422, {"nonce_account": i, "error": str(e)})
+    for pk in accounts:
+        await nonce_pool.release(pk)
+    return {"ok": True, **(await nonce_pool.status())}
+
+
+# --------- COMMAND STREAM ---------
+def command_handler(endpoint, model):
+    """
+    Adapt an endpoint to the command bus: payload dict -> request model.
+    Bad payloads are a 422 (not retried), like over HTTP.
+    """
+    async def handle(payload: dict) -> dict:
+        try:
+            req = model(**payload)
+        except ValidationError as e:
+            raise HTTPException(422, e.errors(include_url=False, include_context=False))
+        return await endpoint(req)
+
+    return handle
+
+
+def command_handlers() -> dict:
+    """
+    Commands SolanaController can XADD, same names as the endpoints.
+    """
+    return {
+        "init-user": command_handler(init_user, InitUserReq),
+        "post": command_handler(post_text, PostReq),
+        "like": command_handler(like, LikeReq),
+        "deposit": command_handler(deposit, DepositReq),
+        "withdraw": command_handler(withdraw, WithdrawReq),
     }
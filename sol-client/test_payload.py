@@ -0,0 +1,53 @@
+import hashlib
+
+import pytest
+
+from payload import CODEC_DEFLATE, MAGIC, VERSION, decode_post, encode_post
+
+LONG = "gm frens, wagmi! https://media.tenor.com/abc.gif " * 20 + "ünïcødé 🚀"
+# compresses, but not below one chunk (POST_CHUNK_SIZE)
+NOISY = " ".join(hashlib.sha256(str(i).encode()).hexdigest()[:12] for i in range(150))
+
+
+def test_plain_round_trip():
+    raw, codec = encode_post("hi")
+    assert codec == "plain"
+    assert raw == b"hi"
+    assert decode_post(raw).decode("utf-8") == "hi"
+
+
+@pytest.mark.parametrize("text", [LONG, NOISY, "x" * 5000])
+def test_compressed_round_trip(text):
+    raw, codec = encode_post(text)
+    assert codec in ("deflate", "deflate-dict1")
+    assert raw.startswith(MAGIC)
+    assert len(raw) < len(text.encode("utf-8"))
+    assert decode_post(raw).decode("utf-8") == text
+
+
+def test_legacy_post_passes_through():
+    # written before the envelope existed: plain utf-8, no MAGIC
+    legacy = "old post ünïcødé 🚀".encode("utf-8")
+    assert decode_post(legacy) == legacy
+
+
+def test_truncated_body_raises():
+    raw, _codec = encode_post(NOISY)
+    assert raw.startswith(MAGIC) and len(raw) > 400
+    # what a root sig alone gives you: the first chunk only
+    with pytest.raises(ValueError):
+        decode_post(raw[:200])
+    with pytest.raises(ValueError):
+        decode_post(raw[:-1])
+
+
+def test_truncated_header_raises():
+    with pytest.raises(ValueError):
+        decode_post(MAGIC + bytes([VERSION]))
+
+
+@pytest.mark.parametrize("version, codec", [(VERSION, 99), (VERSION + 1, CODEC_DEFLATE)])
+def test_unknown_envelope_raises(version, codec):
+    raw, _codec = encode_post(LONG)
+    with pytest.raises(ValueError, match="unknown post envelope"):
+        decode_post(MAGIC + bytes([version, codec]) + raw[len(MAGIC) + 2 :])
@@ -0,0 +1,269 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import httpx
+
+log = logging.getLogger("solapi.trace")
+
+# W3C trace context, shared with Laravel (App\Services\Tracer).
+#
+#   traceparent: 00-<trace id 32 hex>-<parent span id 16 hex>-<flags 2 hex>
+#
+# Every request gets a trace (the caller's, or a new one). Spans are
+# always recorded, it's a list append; what happens at the end:
+#
+#   - sampled (flag 01, or TRACE_SAMPLE_RATE for new traces)
+#       -> exported: TRACE_EXPORT=file (JSON lines, TRACE_FILE)
+#          or TRACE_EXPORT=otlp (OTLP/HTTP JSON to OTEL_EXPORTER_OTLP_ENDPOINT)
+#   - slower than TRACE_SLOW_MS (kept with TRACE_SLOW_SAMPLE_RATE)
+#       -> one log line with the per-span timing breakdown
+
+# --------- CONFIG ---------
+TRACE_EXPORT = os.environ.get("TRACE_EXPORT", "")  # "" | file | otlp
+TRACE_FILE = os.environ.get("TRACE_FILE", "traces.jsonl")
+OTLP_ENDPOINT = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/")
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "sol-service")
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_SLOW_MS = float(os.environ.get("TRACE_SLOW_MS", "1000"))
+TRACE_SLOW_SAMPLE_RATE = float(os.environ.get("TRACE_SLOW_SAMPLE_RATE", "1.0"))
+
+TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attrs", "start_ns", "end_ns", "error")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attrs: dict):
+        self.trace = trace
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    @property
+    def ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+class Trace:
+    """
+    Spans of one incoming request (or stream command).
+    """
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+
+
+def parse_traceparent(header: Optional[str]):
+    """
+    -> (trace_id, parent_span_id, sampled) or None for a missing / bad header.
+    """
+    m = TRACEPARENT_RE.match((header or "").strip().lower())
+    if not m or m.group(1) == "0" * 32 or m.group(2) == "0" * 16:
+        return None
+    return m.group(1), m.group(2), bool(int(m.group(3), 16) & 1)
+
+
+def current_traceparent() -> Optional[str]:
+    s = _current.get()
+    if s is None:
+        return None
+    return f"00-{s.trace.trace_id}-{s.span_id}-{'01' if s.trace.sampled else '00'}"
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Child span of whatever is running. No-op outside a traced request
+    (startup, background monitors).
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+
+    s = Span(parent.trace, name, parent.span_id, attrs)
+    parent.trace.spans.append(s)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        s.end_ns = time.time_ns()
+        _current.reset(token)
+
+
+@contextmanager
+def server_span(name: str, traceparent: Optional[str] = None, **attrs):
+    """
+    Root span for a request, continuing the caller's trace if it sent one.
+    Finishes the trace (export / slow log) on exit.
+    """
+    parsed = parse_traceparent(traceparent)
+    if parsed:
+        trace_id, parent_id, sampled = parsed
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+        sampled = random.random() < TRACE_SAMPLE_RATE
+
+    trace = Trace(trace_id, sampled)
+    root = Span(trace, name, parent_id, attrs)
+    trace.spans.append(root)
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        root.end_ns = time.time_ns()
+        _current.reset(token)
+        finish(trace)
+
+
+# --------- RPC ---------
+class TracedClient:
+    """
+    Wraps solana AsyncClient: every RPC coroutine method runs in a
+    `rpc <method>` span. Everything else is passed through.
+    """
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if not asyncio.iscoroutinefunction(attr) or name.startswith("_") or name == "close":
+            return attr
+
+        async def call(*args, **kwargs):
+            with span(f"rpc {name}", **{"rpc.method": name}):
+                return await attr(*args, **kwargs)
+
+        return call
+
+
+# --------- OUTPUT ---------
+def breakdown(trace: Trace) -> str:
+    """
+    "POST /post 2310ms | rpc send_transaction x3 1890ms, rpc get_latest_blockhash x3 240ms, ..."
+    Spans with the same name are summed; biggest first.
+    """
+    root, children = trace.spans[0], trace.spans[1:]
+    totals: Dict[str, List[float]] = {}
+    for s in children:
+        t = totals.setdefault(s.name, [0, 0.0])
+        t[0] += 1
+        t[1] += s.ms
+    parts = [
+        f"{name}{f' x{n}' if n > 1 else ''} {ms:.0f}ms"
+        for name, (n, ms) in sorted(totals.items(), key=lambda kv: -kv[1][1])
+    ]
+    return f"{root.name} {root.ms:.0f}ms trace={trace.trace_id} | " + ", ".join(parts)
+
+
+def otlp_payload(trace: Trace) -> dict:
+    def value(v):
+        if isinstance(v, bool):
+            return {"boolValue": v}
+        if isinstance(v, int):
+            return {"intValue": str(v)}
+        if isinstance(v, float):
+            return {"doubleValue": v}
+        return {"stringValue": str(v)}
+
+    spans = []
+    for i, s in enumerate(trace.spans):
+        out = {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 2 if i == 0 else 1,  # SERVER / INTERNAL
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or time.time_ns()),
+            "attributes": [{"key": k, "value": value(v)} for k, v in s.attrs.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            out["parentSpanId"] = s.parent_id
+        spans.append(out)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "solapi"}, "spans": spans}],
+        }]
+    }
+
+
+# in-flight exports (keeps the tasks referenced until done)
+_exports: set = set()
+
+
+_file_lock = threading.Lock()  # one writer at a time, lines don't interleave
+
+
+def _write_file(line: str) -> None:
+    try:
+        with _file_lock, open(TRACE_FILE, "a") as f:
+            f.write(line)
+    except OSError as e:
+        log.debug("trace file export failed: %s", e)
+
+
+async def _post_otlp(body: dict) -> None:
+    try:
+        async with httpx.AsyncClient(timeout=5.0) as http:
+            await http.post(f"{OTLP_ENDPOINT}/v1/traces", json=body)
+    except Exception as e:
+        log.debug("otlp export failed: %s", e)
+
+
+def finish(trace: Trace) -> None:
+    root = trace.spans[0]
+
+    if root.ms >= TRACE_SLOW_MS and random.random() < TRACE_SLOW_SAMPLE_RATE:
+        log.warning("slow request: %s", breakdown(trace))
+
+    if not trace.sampled or not TRACE_EXPORT:
+        return
+
+    body = otlp_payload(trace)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    # both off the request path: file writes in a thread, OTLP as a task
+    if TRACE_EXPORT == "file":
+        line = json.dumps(body) + "\n"
+        if loop is None:
+            _write_file(line)
+            return
+        t = loop.create_task(asyncio.to_thread(_write_file, line))
+    elif TRACE_EXPORT == "otlp" and loop is not None:
+        t = loop.create_task(_post_otlp(body))
+    else:
+        return
+    _exports.add(t)
+    t.add_done_callback(_exports.discard)
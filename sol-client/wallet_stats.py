@@ -0,0 +1,82 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Set
+
+from solders.pubkey import Pubkey
+
+log = logging.getLogger("solapi.wallet_stats")
+
+# Shared with Laravel (App\Services\WalletStats): the 'sol' redis
+# connection there has no key prefix, so keep this literal.
+KEY_PREFIX = "sol:wallet_stats:"
+
+
+def stats_key(owner: str) -> str:
+    return KEY_PREFIX + owner
+
+
+class WalletStatsPublisher:
+    """
+    Pushes wallet stat snapshots into Redis so the PHP side can render
+    balances / counters without calling us (and the RPC) per page view.
+
+    Snapshot = the same fields /read-user returns, plus exists and
+    updated_at (unix seconds). PHP decides freshness from updated_at.
+
+    We publish whatever PDA state we see (/read-user, /init-user) and,
+    after our own writes, re-read the PDA once the tx had time to land.
+    """
+
+    def __init__(
+        self,
+        redis,
+        load: Callable[[Pubkey], Awaitable[dict]],
+        *,
+        ttl: int = 86400,
+        refresh_delay: float = 2.0,
+    ):
+        # redis: redis.asyncio.Redis, or None to disable publishing
+        # load(owner) -> snapshot dict (exists + stats + balance_sol)
+        self.redis = redis
+        self._load = load
+        self.ttl = ttl
+        self.refresh_delay = refresh_delay
+        self._pending: Set[Pubkey] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.redis is not None
+
+    async def publish(self, owner: Pubkey, snapshot: dict) -> None:
+        if not self.enabled:
+            return
+        body = {**snapshot, "updated_at": time.time()}
+        try:
+            await self.redis.set(stats_key(str(owner)), json.dumps(body), ex=self.ttl)
+        except Exception as e:
+            log.warning("wallet stats publish for %s failed: %s", owner, e)
+
+    def refresh_soon(self, *owners: Pubkey) -> None:
+        """
+        Re-read + publish these owners after refresh_delay.
+        Owners already waiting for a refresh are not queued twice.
+        """
+        if not self.enabled:
+            return
+        for owner in owners:
+            if owner in self._pending:
+                continue
+            self._pending.add(owner)
+            asyncio.create_task(self._refresh_later(owner))
+
+    async def _refresh_later(self, owner: Pubkey) -> None:
+        try:
+            await asyncio.sleep(self.refresh_delay)
+            self._pending.discard(owner)
+            await self.publish(owner, await self._load(owner))
+        except Exception as e:
+            log.warning("wallet stats refresh for %s failed: %s", owner, e)
+        finally:
+            self._pending.discard(owner)